@@ -1,30 +1,8 @@
 import networkx as nx
 import matplotlib.pyplot as plt
-import math
 
-
-def shift_label(u, v, pos, shift=0.15):
-    """
-    Compute a shifted position for an edge label between nodes u and v.
-    The label is shifted perpendicular to the edge by the specified amount.
-    """
-    x1, y1 = pos[u]
-    x2, y2 = pos[v]
-    # Midpoint of the edge
-    mx = (x1 + x2) / 2
-    my = (y1 + y2) / 2
-    dx = x2 - x1
-    dy = y2 - y1
-    length = math.sqrt(dx ** 2 + dy ** 2)
-    if length == 0:
-        return (mx, my)
-    # Perpendicular vector (normalized)
-    px = -dy / length
-    py = dx / length
-    # Shift the midpoint
-    sx = mx + shift * px
-    sy = my + shift * py
-    return (sx, sy)
+from edge_labels import draw_edge_labels, edge_segments, place_edge_labels
+from graph_render import draw_graph
 
 
 def main():
@@ -70,38 +48,22 @@ def main():
 
     # Draw the graph's nodes, edges, and labels
     plt.figure(figsize=(8, 4))
-    nx.draw_networkx_nodes(G, pos, node_size=800, node_color='white', edgecolors='black')
-    nx.draw_networkx_edges(G, pos, width=1.5, edge_color='black')
-    nx.draw_networkx_labels(G, pos, font_size=10, font_color='black')
-
-    # Get the edge weights from the graph
-    edge_labels = nx.get_edge_attributes(G, 'weight')
+    draw_graph(plt.gca(), G, pos, node_size=800, node_color='white', edgecolors='black',
+               font_size=10, width=1.5, edge_color='black')
 
-    # Define the crossing edges that need label shifting:
-    # Here, (a,d) and (b,c) are one crossing pair,
-    # while (c,f) and (d,e) are another.
-    crossing_edges = [('a', 'd'), ('b', 'c'), ('c', 'f'), ('d', 'e')]
+    # Get the edge weights from the graph, in G.edges() order
+    edge_labels = [w for _, _, w in G.edges(data='weight')]
 
-    # Build a dictionary for label positions for all edges
-    label_pos = {}
-    for u, v in G.edges():
-        # Check if this edge is one of the crossing edges (in either order)
-        if (u, v) in crossing_edges or (v, u) in crossing_edges:
-            # For clarity, alternate the shift direction
-            shift = 0.15 if (u, v) in crossing_edges else -0.15
-            label_pos[(u, v)] = shift_label(u, v, pos, shift)
-        else:
-            # For non-crossing edges, no shift (or you can adjust if needed)
-            label_pos[(u, v)] = shift_label(u, v, pos, 0)
+    # Find the crossing edges automatically with the spatial grid; here
+    # (a,d) and (b,c) are one crossing pair, while (c,f) and (d,e) are another.
+    # The labels of crossing edges are shifted perpendicular to the edge, all
+    # others stay at the midpoint.
+    u, v, p, q = edge_segments(G, pos)
+    label_pos, _ = place_edge_labels(p, q, u, v, shift=0.15)
 
-    # Manually draw edge labels using plt.text
-    for edge, (x, y) in label_pos.items():
-        # Retrieve the label for the edge; check both (u,v) and (v,u)
-        label = edge_labels.get(edge)
-        if label is None:
-            label = edge_labels.get((edge[1], edge[0]), "")
-        plt.text(x, y, str(label), color='red', fontsize=10,
-                 horizontalalignment='center', verticalalignment='center')
+    # Draw all edge labels as one batched artist, on white boxes so they stay
+    # readable where edges cross
+    draw_edge_labels(plt.gca(), label_pos, edge_labels, fontsize=10, color='red', background='white')
 
     plt.axis('equal')
     plt.axis('off')
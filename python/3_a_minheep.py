@@ -1,9 +1,1063 @@
+import argparse
+import asyncio
+import queue
 import random
+import threading
+from array import array
+import time
 import matplotlib.pyplot as plt
 import networkx as nx
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
 
 
 class MinHeap:
+    __slots__ = ('d', 'heap')
+
+    def __init__(self, d=2):
+        # d is the arity: every node has up to d children (2 gives the classic binary heap)
+        if d < 2:
+            raise ValueError("A heap needs at least two children per node")
+        self.d = d
+        self.heap = []
+
+    @classmethod
+    def from_iterable(cls, iterable, d=2):
+        """Builds a heap from any iterable in O(n) by sifting down from the last parent to the root."""
+        heap = cls(d)
+        heap.heap = list(iterable)
+        heap.build()
+        return heap
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __iter__(self):
+        # Keys in heap (array) order, like iterating the list behind heapq
+        return iter(self.heap)
+
+    def parent(self, i):
+        return (i - 1) // self.d
+
+    def left(self, i):
+        return self.d * i + 1
+
+    def right(self, i):
+        return self.d * i + 2
+
+    def children(self, i):
+        first = self.d * i + 1
+        return range(first, min(first + self.d, len(self.heap)))
+
+    def _sift_up(self, i):
+        # Move the hole up past every larger parent, then drop the key into it
+        heap = self.heap
+        d = self.d
+        key = heap[i]
+        while i > 0:
+            p = (i - 1) // d
+            parent_key = heap[p]
+            if not parent_key > key:
+                break
+            heap[i] = parent_key
+            i = p
+        heap[i] = key
+
+    def _sift_down(self, i, size):
+        # Move the hole down past every smaller child, then drop the key into it
+        heap = self.heap
+        d = self.d
+        key = heap[i]
+        while True:
+            child = d * i + 1
+            if child >= size:
+                break
+            child_key = heap[child]
+            if d == 2:
+                if child + 1 < size and heap[child + 1] < child_key:
+                    child += 1
+                    child_key = heap[child]
+            else:
+                # Scan the siblings in place; strict < keeps the first smallest on ties
+                j = child + 1
+                end = min(child + d, size)
+                while j < end:
+                    if heap[j] < child_key:
+                        child = j
+                        child_key = heap[j]
+                    j += 1
+            if not child_key < key:
+                break
+            heap[i] = child_key
+            i = child
+        heap[i] = key
+
+    def insert(self, key):
+        # Append the new key at the end and sift it up to maintain the heap property
+        self.heap.append(key)
+        self._sift_up(len(self.heap) - 1)
+
+    def heapify(self, i, size=None):
+        # size limits the heap to self.heap[:size]; heapsort uses it for the shrinking prefix
+        self._sift_down(i, len(self.heap) if size is None else size)
+
+    def build(self):
+        """Restores the heap property over the whole list in O(n)."""
+        for i in range((len(self.heap) - 2) // self.d, -1, -1):
+            self._sift_down(i, len(self.heap))
+
+    def push_many(self, keys):
+        keys = list(keys)
+        if len(keys) >= len(self.heap):
+            # Rebuilding costs O(n + k), cheaper than k sift-ups once k is this large
+            self.heap.extend(keys)
+            self.build()
+        else:
+            for key in keys:
+                self.insert(key)
+
+    def pop_many(self, k):
+        """Removes and returns the k smallest keys (fewer if the heap runs out) in sorted order."""
+        return [self.extract_min() for _ in range(min(k, len(self.heap)))]
+
+    def nsmallest(self, k):
+        """
+        Returns the k smallest keys in sorted order without modifying the heap.
+
+        Walks the heap with a second heap of frontier positions, so it costs
+        O(k log k) instead of touching all n keys.
+        """
+        result = []
+        if not self.heap or k <= 0:
+            return result
+        frontier = MinHeap(self.d)
+        frontier.insert((self.heap[0], 0))
+        while frontier.heap and len(result) < k:
+            key, i = frontier.extract_min()
+            result.append(key)
+            for child in self.children(i):
+                frontier.insert((self.heap[child], child))
+        return result
+
+    def heapsort(self):
+        """
+        Sorts self.heap in place in ascending order and returns it.
+
+        Repeatedly moves the minimum behind a shrinking heap prefix, which
+        leaves the list in descending order; reversing it gives ascending
+        order, which is itself a valid min heap.
+        """
+        for end in range(len(self.heap) - 1, 0, -1):
+            self.heap[0], self.heap[end] = self.heap[end], self.heap[0]
+            self.heapify(0, end)
+        self.heap.reverse()
+        return self.heap
+
+    def extract_min(self):
+        if not self.heap:
+            return None  # or raise an exception if preferred
+        last = self.heap.pop()
+        if not self.heap:
+            return last
+
+        root = self.heap[0]
+        self.heap[0] = last
+        self._sift_down(0, len(self.heap))
+        return root
+
+    def get_min(self):
+        return self.heap[0] if self.heap else None
+
+    def meld(self, other):
+        """Moves every key of other into this heap in O(n + m) and empties other."""
+        if other is self:
+            raise ValueError("A heap cannot be melded into itself")
+        self.push_many(other.heap)
+        del other.heap[:]
+
+    def _layout(self, max_depth=None, max_nodes=None):
+        """
+        Computes the tree layout straight from the array indices in O(n).
+
+        Level k holds indices first[k]..first[k+1]-1 and splits the unit
+        width into d**k equal slots, which is the layout a recursive split of
+        every node's range between its d children would give. Levels are cut
+        off below max_depth, and before the level that would exceed max_nodes.
+
+        Returns:
+          tuple: (x, y, parent, keys, collapsed) with parent -1 for the root and
+            collapsed marking shown nodes whose children were cut off.
+        """
+        n = len(self.heap)
+        d = self.d
+        first = [0]
+        while first[-1] < n:
+            first.append(first[-1] * d + 1)
+        levels = len(first) - 1
+        if max_depth is not None:
+            levels = min(levels, max_depth + 1)
+        if max_nodes is not None:
+            while levels > 1 and min(n, first[levels]) > max_nodes:
+                levels -= 1
+        shown = min(n, first[levels])
+
+        index = np.arange(shown)
+        first = np.array(first)
+        depth = np.searchsorted(first, index, side='right') - 1
+        x = (index - first[depth] + 0.5) / np.power(float(d), depth)
+        parent = (index - 1) // d
+        parent[0] = -1
+        collapsed = (index * d + 1 >= shown) & (index * d + 1 < n)
+        return x, -depth.astype(float), parent, self.heap[:shown], collapsed
+
+    def draw(self, max_depth=None, path=None, dpi=100, max_labels=200, max_nodes=100000):
+        """
+        Visualizes the heap as a tree (or forest) with Matplotlib collections.
+
+        All edges go into one LineCollection and all nodes into one scatter,
+        and only the top levels holding at most max_nodes nodes are drawn, so
+        drawing stays fast for heaps with millions of entries. Nodes whose
+        subtrees are cut off are drawn in orange. Keys are only written next
+        to the nodes when at most max_labels are shown.
+
+        Parameters:
+          max_depth (int, optional): Deepest level to draw (the root is level 0).
+          max_nodes (int, optional): Drop the deepest levels until at most this
+            many nodes are drawn; None draws every level.
+          path (str, optional): Write the figure to this file (PNG, SVG, ...)
+            instead of showing it; this does not need a display.
+          dpi (int): Resolution used when writing to path.
+          max_labels (int): Largest number of nodes that still get key labels.
+        """
+        if not len(self):
+            print("Heap is empty. Nothing to draw.")
+            return
+
+        x, y, parent, keys, collapsed = self._layout(max_depth, max_nodes)
+        # A bare Figure renders without pyplot, so writing to disk works headless
+        fig = Figure(figsize=(8, 6)) if path else plt.figure(figsize=(8, 6))
+        ax = fig.add_subplot()
+
+        child = np.flatnonzero(parent >= 0)
+        segments = np.stack([np.column_stack([x[parent[child]], y[parent[child]]]),
+                             np.column_stack([x[child], y[child]])], axis=1)
+        ax.add_collection(LineCollection(segments, colors='black', linewidths=0.8, zorder=1))
+        node_size = 800 if len(x) <= 50 else 40000 / len(x)
+        order = np.lexsort((x, y))
+        gaps = np.diff(x[order])[y[order][1:] == y[order][:-1]]
+        if gaps.size:
+            # Keep every marker narrower than the closest pair of nodes on one level
+            # (the axes cover about 0.775 of the figure width, the margins add 10%)
+            span = 1.1 * (x.max() - x.min())
+            slot = gaps.min() / span * fig.get_figwidth() * 0.775 * 72
+            node_size = min(node_size, (0.8 * slot) ** 2)
+        node_size = max(1.0, node_size)
+        fontsize = min(10.0, max(4.0, 0.45 * np.sqrt(node_size)))
+        # One scatter per color: per-point color strings are slow to convert
+        ax.scatter(x[~collapsed], y[~collapsed], s=node_size, c='lightblue', zorder=2)
+        ax.scatter(x[collapsed], y[collapsed], s=node_size, c='orange', zorder=2)
+        if len(x) <= max_labels:
+            for xi, yi, key in zip(x, y, keys):
+                ax.text(xi, yi, str(key), ha='center', va='center', fontsize=fontsize, zorder=3)
+
+        ax.set_title("Min Heap Visualization")
+        ax.margins(0.05)
+        ax.axis('off')
+        if path:
+            fig.savefig(path, dpi=dpi)
+        else:
+            plt.show()
+
+
+def _forest_layout(heap, max_depth=None, max_nodes=None):
+    """
+    Level-by-level layout for pointer-based heaps that describe themselves with _tree().
+
+    Every shown subtree gets a share of the width proportional to its number
+    of shown leaves, so leaves are evenly spaced and large subtrees do not
+    crowd into the same slot as small ones. Returns the same arrays as MinHeap._layout.
+    """
+    roots, children, labels = heap._tree()
+    # Shown nodes in level order, so parents come before their children
+    nodes = list(roots)
+    parent = [-1] * len(nodes)
+    depths = [0] * len(nodes)
+    collapsed = [False] * len(nodes)
+    start = 0
+    depth = 0
+    while start < len(nodes):
+        end = len(nodes)
+        next_nodes, next_parent = [], []
+        for position in range(start, end):
+            for child in children[nodes[position]]:
+                next_nodes.append(child)
+                next_parent.append(position)
+        depth += 1
+        if next_nodes and ((max_depth is not None and depth > max_depth)
+                           or (max_nodes is not None and end + len(next_nodes) > max_nodes)):
+            for position in next_parent:
+                collapsed[position] = True
+            break
+        nodes.extend(next_nodes)
+        parent.extend(next_parent)
+        depths.extend([depth] * len(next_nodes))
+        collapsed.extend([False] * len(next_nodes))
+        start = end
+
+    # Shown leaves below every node, summed bottom-up
+    n = len(nodes)
+    leaves = [0] * n
+    for i in range(n - 1, -1, -1):
+        if leaves[i] == 0:
+            leaves[i] = 1
+        if parent[i] >= 0:
+            leaves[parent[i]] += leaves[i]
+
+    # Left edge of every node in leaf units; children fill their parent's range in order
+    left = [0] * n
+    cursor = left[:]
+    roots_cursor = 0
+    for i in range(n):
+        if parent[i] < 0:
+            left[i] = roots_cursor
+            roots_cursor += leaves[i]
+        else:
+            left[i] = cursor[parent[i]]
+            cursor[parent[i]] += leaves[i]
+        cursor[i] = left[i]
+
+    total = max(roots_cursor, 1)
+    x = (np.array(left, dtype=float) + np.array(leaves, dtype=float) / 2) / total
+    return (x, -np.array(depths, dtype=float), np.array(parent, dtype=int),
+            [labels[node] for node in nodes], np.array(collapsed, dtype=bool))
+
+
+class ArrayMinHeap(MinHeap):
+    """
+    MinHeap whose keys live in a typed array.array instead of a list of boxed objects.
+
+    Every key costs one machine word ('q' for 64-bit integers, 'd' for floats)
+    instead of a list slot plus an int object. payload_types gives the
+    typecodes of optional parallel payload arrays; insert then takes one value
+    per payload array and extract_min/get_min return (key, *payload).
+    """
+    __slots__ = ('payloads',)
+
+    def __init__(self, d=2, typecode='q', payload_types=()):
+        super().__init__(d)
+        self.heap = array(typecode)
+        self.payloads = tuple(array(t) for t in payload_types)
+
+    @classmethod
+    def from_iterable(cls, iterable, d=2, typecode='q'):
+        heap = cls(d, typecode)
+        heap.heap = array(typecode, iterable)
+        heap.build()
+        return heap
+
+    def _sift_up(self, i):
+        if not self.payloads:
+            return super()._sift_up(i)
+        heap = self.heap
+        d = self.d
+        key = heap[i]
+        values = [payload[i] for payload in self.payloads]
+        while i > 0:
+            p = (i - 1) // d
+            parent_key = heap[p]
+            if not parent_key > key:
+                break
+            heap[i] = parent_key
+            for payload in self.payloads:
+                payload[i] = payload[p]
+            i = p
+        heap[i] = key
+        for payload, value in zip(self.payloads, values):
+            payload[i] = value
+
+    def _sift_down(self, i, size):
+        if not self.payloads:
+            return super()._sift_down(i, size)
+        heap = self.heap
+        d = self.d
+        key = heap[i]
+        values = [payload[i] for payload in self.payloads]
+        while True:
+            child = d * i + 1
+            if child >= size:
+                break
+            child_key = heap[child]
+            j = child + 1
+            end = min(child + d, size)
+            while j < end:
+                if heap[j] < child_key:
+                    child = j
+                    child_key = heap[j]
+                j += 1
+            if not child_key < key:
+                break
+            heap[i] = child_key
+            for payload in self.payloads:
+                payload[i] = payload[child]
+            i = child
+        heap[i] = key
+        for payload, value in zip(self.payloads, values):
+            payload[i] = value
+
+    def insert(self, key, *payload):
+        if len(payload) != len(self.payloads):
+            raise ValueError(f"Expected {len(self.payloads)} payload values, got {len(payload)}")
+        self.heap.append(key)
+        for values, value in zip(self.payloads, payload):
+            values.append(value)
+        self._sift_up(len(self.heap) - 1)
+
+    def push_many(self, keys):
+        if self.payloads:
+            raise ValueError("push_many takes bare keys; insert keys with payloads one at a time")
+        super().push_many(keys)
+
+    def extract_min(self):
+        if not self.payloads:
+            return super().extract_min()
+        if not self.heap:
+            return None
+        last = (self.heap.pop(),) + tuple(payload.pop() for payload in self.payloads)
+        if not self.heap:
+            return last
+
+        root = self.get_min()
+        self.heap[0] = last[0]
+        for payload, value in zip(self.payloads, last[1:]):
+            payload[0] = value
+        self._sift_down(0, len(self.heap))
+        return root
+
+    def get_min(self):
+        if not self.payloads or not self.heap:
+            return super().get_min()
+        return (self.heap[0],) + tuple(payload[0] for payload in self.payloads)
+
+    def heapsort(self):
+        if not self.payloads:
+            return super().heapsort()
+        # Keys and payloads must move together, so drain into fresh arrays
+        entries = [self.extract_min() for _ in range(len(self.heap))]
+        self.heap = array(self.heap.typecode, (entry[0] for entry in entries))
+        self.payloads = tuple(array(payload.typecode, (entry[k + 1] for entry in entries))
+                              for k, payload in enumerate(self.payloads))
+        return self.heap
+
+
+class _PairingNode:
+    __slots__ = ('key', 'child', 'sibling')
+
+    def __init__(self, key):
+        self.key = key
+        self.child = None  # leftmost child
+        self.sibling = None  # next sibling to the right
+
+
+class PairingHeap:
+    """
+    Pairing heap: a heap-ordered multiway tree with O(1) insert and meld.
+
+    extract_min relinks the root's children with the two-pass pairing scheme
+    in O(log n) amortized time.
+    """
+    __slots__ = ('root', 'size')
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    @classmethod
+    def from_iterable(cls, iterable):
+        heap = cls()
+        for key in iterable:
+            heap.insert(key)
+        return heap
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        """Yields every key once, parents before their children."""
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            yield node.key
+            child = node.child
+            while child is not None:
+                stack.append(child)
+                child = child.sibling
+
+    @staticmethod
+    def _link(a, b):
+        # The root with the larger key becomes the leftmost child of the other
+        if b.key < a.key:
+            a, b = b, a
+        b.sibling = a.child
+        a.child = b
+        return a
+
+    def insert(self, key):
+        node = _PairingNode(key)
+        self.root = node if self.root is None else self._link(self.root, node)
+        self.size += 1
+
+    def meld(self, other):
+        """Moves every key of other into this heap in O(1) and empties other."""
+        if other is self:
+            raise ValueError("A heap cannot be melded into itself")
+        if other.root is not None:
+            self.root = other.root if self.root is None else self._link(self.root, other.root)
+            self.size += other.size
+        other.root = None
+        other.size = 0
+
+    def get_min(self):
+        return self.root.key if self.root is not None else None
+
+    def extract_min(self):
+        if self.root is None:
+            return None
+        root = self.root
+        # First pass: link the children in pairs from left to right
+        pairs = []
+        node = root.child
+        while node is not None:
+            second = node.sibling
+            if second is None:
+                node.sibling = None
+                pairs.append(node)
+                break
+            following = second.sibling
+            node.sibling = second.sibling = None
+            pairs.append(self._link(node, second))
+            node = following
+        # Second pass: link the pairs from right to left
+        merged = pairs.pop() if pairs else None
+        while pairs:
+            merged = self._link(pairs.pop(), merged)
+        self.root = merged
+        self.size -= 1
+        return root.key
+
+    def _tree(self):
+        children = {}
+        labels = {}
+        ids = {}
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            node_id = ids.setdefault(id(node), len(ids))
+            labels[node_id] = node.key
+            kids = []
+            child = node.child
+            while child is not None:
+                kids.append(ids.setdefault(id(child), len(ids)))
+                stack.append(child)
+                child = child.sibling
+            children[node_id] = kids
+        return [0] if labels else [], children, labels
+
+    _layout = _forest_layout
+    draw = MinHeap.draw
+
+
+class _BinomialNode:
+    __slots__ = ('key', 'order', 'children')
+
+    def __init__(self, key):
+        self.key = key
+        self.order = 0
+        self.children = []
+
+
+class BinomialHeap:
+    """
+    Binomial heap: a list of heap-ordered binomial trees, at most one per order.
+
+    The trees behave like the digits of a binary counter, so insert is O(1)
+    amortized and meld, get_min and extract_min are O(log n).
+    """
+    __slots__ = ('trees', 'size')
+
+    def __init__(self):
+        self.trees = []  # trees[k] is the tree of order k, or None
+        self.size = 0
+
+    @classmethod
+    def from_iterable(cls, iterable):
+        heap = cls()
+        for key in iterable:
+            heap.insert(key)
+        return heap
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        """Yields every key once, parents before their children."""
+        stack = [tree for tree in self.trees if tree is not None]
+        while stack:
+            node = stack.pop()
+            yield node.key
+            stack.extend(node.children)
+
+    @staticmethod
+    def _link(a, b):
+        if b.key < a.key:
+            a, b = b, a
+        a.children.append(b)
+        a.order += 1
+        return a
+
+    def _add_tree(self, tree):
+        # Add the tree like a carry in binary addition
+        k = tree.order
+        while k < len(self.trees) and self.trees[k] is not None:
+            tree = self._link(self.trees[k], tree)
+            self.trees[k] = None
+            k += 1
+        if k >= len(self.trees):
+            self.trees.extend([None] * (k + 1 - len(self.trees)))
+        self.trees[k] = tree
+
+    def insert(self, key):
+        self._add_tree(_BinomialNode(key))
+        self.size += 1
+
+    def meld(self, other):
+        """Moves every key of other into this heap in O(log n) and empties other."""
+        if other is self:
+            raise ValueError("A heap cannot be melded into itself")
+        for tree in other.trees:
+            if tree is not None:
+                self._add_tree(tree)
+        self.size += other.size
+        other.trees = []
+        other.size = 0
+
+    def _min_order(self):
+        best = None
+        for k, tree in enumerate(self.trees):
+            if tree is not None and (best is None or tree.key < self.trees[best].key):
+                best = k
+        return best
+
+    def get_min(self):
+        k = self._min_order()
+        return self.trees[k].key if k is not None else None
+
+    def extract_min(self):
+        k = self._min_order()
+        if k is None:
+            return None
+        root = self.trees[k]
+        self.trees[k] = None
+        while self.trees and self.trees[-1] is None:
+            self.trees.pop()
+        # The children of an order-k root are trees of orders 0..k-1
+        for child in root.children:
+            self._add_tree(child)
+        self.size -= 1
+        return root.key
+
+    def _tree(self):
+        children = {}
+        labels = {}
+        stack = [tree for tree in self.trees if tree is not None]
+        ids = {id(tree): i for i, tree in enumerate(stack)}
+        roots = list(range(len(stack)))
+        while stack:
+            node = stack.pop()
+            node_id = ids[id(node)]
+            labels[node_id] = node.key
+            kids = []
+            for child in node.children:
+                ids[id(child)] = len(ids)
+                kids.append(ids[id(child)])
+                stack.append(child)
+            children[node_id] = kids
+        return roots, children, labels
+
+    _layout = _forest_layout
+    draw = MinHeap.draw
+
+
+# Backends selectable by name; all share insert/extract_min/get_min/meld/draw
+HEAP_BACKENDS = {
+    'binary': MinHeap,
+    'array': ArrayMinHeap,
+    'pairing': PairingHeap,
+    'binomial': BinomialHeap,
+}
+
+
+def make_heap(backend='binary', iterable=()):
+    """
+    Creates a heap of the selected backend.
+
+    Parameters:
+      backend (str): One of HEAP_BACKENDS: 'binary', 'array', 'pairing' or 'binomial'.
+      iterable (iterable): Initial keys.
+
+    Returns:
+      A heap exposing insert, extract_min, get_min, meld and draw.
+    """
+    try:
+        cls = HEAP_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown heap backend: {backend!r}") from None
+    return cls.from_iterable(iterable)
+
+
+def _insert_key(heap, key):
+    """
+    Inserts a queued key, choosing the key type of an 'array' backend from the first key.
+
+    ArrayMinHeap keeps its keys in a typed array, so it can only queue plain
+    numbers: an empty heap switches to 'q' for an int key and 'd' for a float
+    key, and any other key raises TypeError instead of a bare array error.
+    """
+    if isinstance(heap, ArrayMinHeap):
+        if isinstance(key, float):
+            typecode = 'd'
+        elif isinstance(key, (int, np.integer)):
+            typecode = 'q'
+        else:
+            raise TypeError(f"The 'array' backend only queues int or float keys, not {type(key).__name__}; "
+                            f"use the 'binary' backend for (priority, job) tuples")
+        if not len(heap):
+            heap.heap = array(typecode)
+        elif heap.heap.typecode != typecode:
+            raise TypeError(f"The 'array' backend holds {'float' if heap.heap.typecode == 'd' else 'int'} "
+                            f"keys; got {type(key).__name__}")
+    heap.insert(key)
+
+
+class ConcurrentMinHeap(queue.Queue):
+    """
+    Thread-safe job queue backed by any heap backend.
+
+    Built on the queue.Queue hooks (like queue.PriorityQueue), so put and get
+    block with optional timeouts and raise queue.Full/queue.Empty, and the
+    mutex is held only for the O(log n) heap update itself. With the 'array'
+    backend keys must be all ints or all floats (see _insert_key).
+    """
+
+    def __init__(self, maxsize=0, backend='binary'):
+        self.backend = backend
+        super().__init__(maxsize)
+
+    def _init(self, maxsize):
+        self.heap = make_heap(self.backend)
+
+    def _qsize(self):
+        return len(self.heap)
+
+    def _put(self, key):
+        _insert_key(self.heap, key)
+
+    def _get(self):
+        return self.heap.extract_min()
+
+    def __len__(self):
+        return self.qsize()
+
+    def insert(self, key):
+        self.put(key, block=False)
+
+    def extract_min(self):
+        try:
+            return self.get(block=False)
+        except queue.Empty:
+            return None
+
+    def get_min(self):
+        with self.mutex:
+            return self.heap.get_min()
+
+
+class AsyncMinHeap(asyncio.Queue):
+    """
+    asyncio job queue backed by any heap backend: get awaits while the heap is empty.
+
+    Built on the asyncio.Queue hooks, like asyncio.PriorityQueue. With the
+    'array' backend keys must be all ints or all floats (see _insert_key).
+    """
+
+    def __init__(self, maxsize=0, backend='binary'):
+        self.backend = backend
+        super().__init__(maxsize)
+
+    def _init(self, maxsize):
+        # asyncio.Queue checks len(self._queue) directly for empty/full/qsize
+        self.heap = self._queue = make_heap(self.backend)
+
+    def _put(self, key):
+        _insert_key(self.heap, key)
+
+    def _get(self):
+        return self.heap.extract_min()
+
+    def __len__(self):
+        return self.qsize()
+
+    def get_min(self):
+        return self.heap.get_min()
+
+
+def benchmark_concurrent(items=200000, thread_counts=((1, 1), (4, 4), (16, 16)), seed=0):
+    """
+    Prints the throughput of ConcurrentMinHeap and AsyncMinHeap with many producers and consumers.
+
+    Producers split the items between them; after they finish, one sentinel
+    per consumer (an infinite key, so it sorts last) stops the consumers.
+    """
+    rng = random.Random(seed)
+    keys = [rng.random() for _ in range(items)]
+    stop = float('inf')
+
+    print(f"{'front-end':>10} {'producers':>10} {'consumers':>10} {'items/s':>12}")
+    for producers, consumers in thread_counts:
+        jobs = ConcurrentMinHeap()
+
+        def produce(part):
+            for key in part:
+                jobs.put(key)
+
+        def consume():
+            while jobs.get() != stop:
+                pass
+
+        start = time.perf_counter()
+        producer_threads = [threading.Thread(target=produce, args=(keys[k::producers],))
+                            for k in range(producers)]
+        consumer_threads = [threading.Thread(target=consume) for _ in range(consumers)]
+        for thread in producer_threads + consumer_threads:
+            thread.start()
+        for thread in producer_threads:
+            thread.join()
+        for _ in range(consumers):
+            jobs.put(stop)
+        for thread in consumer_threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        print(f"{'threads':>10} {producers:>10} {consumers:>10} {items / elapsed:>12,.0f}")
+
+    for producers, consumers in thread_counts:
+        async def run():
+            jobs = AsyncMinHeap()
+
+            async def produce(part):
+                for key in part:
+                    await jobs.put(key)
+
+            async def consume():
+                while await jobs.get() != stop:
+                    pass
+
+            consumer_tasks = [asyncio.create_task(consume()) for _ in range(consumers)]
+            await asyncio.gather(*(produce(keys[k::producers]) for k in range(producers)))
+            for _ in range(consumers):
+                await jobs.put(stop)
+            await asyncio.gather(*consumer_tasks)
+
+        start = time.perf_counter()
+        asyncio.run(run())
+        elapsed = time.perf_counter() - start
+        print(f"{'asyncio':>10} {producers:>10} {consumers:>10} {items / elapsed:>12,.0f}")
+
+
+class IndexedMinHeap:
+    """
+    Binary min heap of (item, priority) pairs that remembers where every item is.
+
+    The position map lets Prim's and Dijkstra's algorithms lower the priority of
+    an item already in the queue instead of pushing a duplicate.
+    """
+
+    def __init__(self):
+        self.heap = []  # [priority, item] entries
+        self.position = {}  # item -> index in self.heap
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, item):
+        return item in self.position
+
+    def contains(self, item):
+        return item in self.position
+
+    def priority(self, item):
+        return self.heap[self.position[item]][0]
+
+    def parent(self, i):
+        return (i - 1) // 2
+
+    def left(self, i):
+        return 2 * i + 1
+
+    def right(self, i):
+        return 2 * i + 2
+
+    def _sift_up(self, i):
+        # Move the hole up past every larger parent, then drop the entry into it
+        heap = self.heap
+        position = self.position
+        entry = heap[i]
+        priority = entry[0]
+        while i > 0:
+            p = (i - 1) // 2
+            parent_entry = heap[p]
+            if not parent_entry[0] > priority:
+                break
+            heap[i] = parent_entry
+            position[parent_entry[1]] = i
+            i = p
+        heap[i] = entry
+        position[entry[1]] = i
+
+    def _sift_down(self, i):
+        # Move the hole down past every smaller child, then drop the entry into it
+        heap = self.heap
+        position = self.position
+        size = len(heap)
+        entry = heap[i]
+        priority = entry[0]
+        while True:
+            child = 2 * i + 1
+            if child >= size:
+                break
+            child_entry = heap[child]
+            if child + 1 < size and heap[child + 1][0] < child_entry[0]:
+                child += 1
+                child_entry = heap[child]
+            if not child_entry[0] < priority:
+                break
+            heap[i] = child_entry
+            position[child_entry[1]] = i
+            i = child
+        heap[i] = entry
+        position[entry[1]] = i
+
+    def insert(self, item, priority):
+        if item in self.position:
+            raise KeyError(f"{item!r} is already in the heap")
+        self.heap.append([priority, item])
+        self.position[item] = len(self.heap) - 1
+        self._sift_up(len(self.heap) - 1)
+
+    def decrease_key(self, item, priority):
+        i = self.position[item]
+        if priority > self.heap[i][0]:
+            raise ValueError("New priority is larger than the current one")
+        self.heap[i][0] = priority
+        self._sift_up(i)
+
+    def pop_min(self):
+        """Removes and returns the (item, priority) pair with the smallest priority."""
+        if not self.heap:
+            return None
+        last = self.heap.pop()
+        if not self.heap:
+            del self.position[last[1]]
+            return last[1], last[0]
+
+        priority, item = self.heap[0]
+        del self.position[item]
+        self.heap[0] = last
+        self._sift_down(0)
+        return item, priority
+
+    def peek_min(self):
+        if not self.heap:
+            return None
+        priority, item = self.heap[0]
+        return item, priority
+
+
+def prim_mst(G):
+    """
+    Computes the Minimum Spanning Tree (MST) of a graph using Prim's algorithm.
+
+    Uses IndexedMinHeap with decrease_key, so every vertex is in the queue at
+    most once and the running time is O(E log V). Disconnected graphs give a
+    spanning forest, like kruskal_mst.
+
+    Parameters:
+      G (NetworkX Graph): A weighted graph, e.g. from generate_weighted_graph.
+
+    Returns:
+      NetworkX Graph: A graph representing the MST.
+    """
+    T = nx.Graph()
+    T.add_nodes_from(G.nodes())
+    in_tree = set()
+    best_edge = {}  # vertex -> tree vertex of its cheapest connecting edge
+    frontier = IndexedMinHeap()
+
+    for root in G.nodes():
+        if root in in_tree:
+            continue
+        frontier.insert(root, 0)
+        best_edge[root] = None
+        while frontier:
+            u, weight = frontier.pop_min()
+            in_tree.add(u)
+            if best_edge[u] is not None:
+                T.add_edge(best_edge[u], u, weight=weight)
+            for v, data in G[u].items():
+                if v in in_tree:
+                    continue
+                w = data['weight']
+                if v not in frontier:
+                    frontier.insert(v, w)
+                    best_edge[v] = u
+                elif w < frontier.priority(v):
+                    frontier.decrease_key(v, w)
+                    best_edge[v] = u
+    return T
+
+
+def benchmark_mst(workloads=((5000, 0.001), (2000, 0.02), (500, 0.5)), min_weight=1, max_weight=10, seed=0):
+    """
+    Times prim_mst against kruskal_mst on graphs from generate_weighted_graph.
+
+    Sparse graphs favour Kruskal's sort of the edges, dense ones Prim's
+    decrease_key, so the table shows which one suits a workload. Both trees
+    must have the same total weight.
+
+    Parameters:
+      workloads (tuple): (num_nodes, edge_probability) of every graph.
+      min_weight, max_weight (int): Range of the edge weights.
+      seed (int): Seed for the graph generator.
+    """
+    # Imported here so that using the heaps does not pull in the graph and drawing modules
+    from graph_creation import generate_weighted_graph, kruskal_mst
+
+    print(f"{'nodes':>7} {'edges':>9} {'Prim (s)':>9} {'Kruskal (s)':>12}")
+    for num_nodes, edge_probability in workloads:
+        G = generate_weighted_graph(num_nodes, edge_probability, min_weight, max_weight, seed=seed, method='skip')
+        start = time.perf_counter()
+        prim = prim_mst(G)
+        prim_time = time.perf_counter() - start
+        start = time.perf_counter()
+        kruskal = kruskal_mst(G)
+        kruskal_time = time.perf_counter() - start
+        if prim.size(weight='weight') != kruskal.size(weight='weight'):
+            raise RuntimeError(f"Prim and Kruskal disagree on the MST weight for {num_nodes} nodes")
+        print(f"{num_nodes:>7} {G.number_of_edges():>9} {prim_time:>9.3f} {kruskal_time:>12.3f}")
+
+
+class SwapMinHeap:
+    """The original recursive, swap-based binary heap, kept as the baseline for benchmark_heaps."""
+
     def __init__(self):
         self.heap = []
 
@@ -17,7 +1071,6 @@ class MinHeap:
         return 2 * i + 2
 
     def insert(self, key):
-        # Append the new key at the end and sift it up to maintain the heap property
         self.heap.append(key)
         i = len(self.heap) - 1
         while i != 0 and self.heap[self.parent(i)] > self.heap[i]:
@@ -28,72 +1081,124 @@ class MinHeap:
         l = self.left(i)
         r = self.right(i)
         smallest = i
-
         if l < len(self.heap) and self.heap[l] < self.heap[smallest]:
             smallest = l
         if r < len(self.heap) and self.heap[r] < self.heap[smallest]:
             smallest = r
-
         if smallest != i:
             self.heap[i], self.heap[smallest] = self.heap[smallest], self.heap[i]
             self.heapify(smallest)
 
     def extract_min(self):
         if not self.heap:
-            return None  # or raise an exception if preferred
+            return None
         if len(self.heap) == 1:
             return self.heap.pop()
-
         root = self.heap[0]
         self.heap[0] = self.heap.pop()
         self.heapify(0)
         return root
 
-    def get_min(self):
-        return self.heap[0] if self.heap else None
 
-    def draw(self):
-        """Visualizes the heap as a binary tree using networkx and matplotlib."""
-        if not self.heap:
-            print("Heap is empty. Nothing to draw.")
-            return
+def benchmark_heaps(n=200000, arities=(2, 4, 8), seed=0):
+    """
+    Prints insert and extract_min throughput of MinHeap for each arity against SwapMinHeap.
 
-        G = nx.DiGraph()
-        # Add nodes and edges according to the heap list
-        for i, val in enumerate(self.heap):
-            G.add_node(i, label=str(val))
-            left_index = self.left(i)
-            right_index = self.right(i)
-            if left_index < len(self.heap):
-                G.add_edge(i, left_index)
-            if right_index < len(self.heap):
-                G.add_edge(i, right_index)
-
-        # Compute positions for a binary tree layout
-        pos = {}
-
-        def assign_pos(index, depth, x_min, x_max):
-            if index >= len(self.heap):
-                return
-            x = (x_min + x_max) / 2
-            pos[index] = (x, -depth)  # Negative depth to have the root at the top
-            assign_pos(self.left(index), depth + 1, x_min, x)
-            assign_pos(self.right(index), depth + 1, x, x_max)
-
-        assign_pos(0, 0, 0, 1)
-
-        # Create labels dictionary for nodes
-        labels = {i: self.heap[i] for i in range(len(self.heap))}
-        plt.figure(figsize=(8, 6))
-        nx.draw(G, pos, with_labels=True, labels=labels, node_size=800, node_color='lightblue', arrows=False)
-        plt.title("Min Heap Visualization")
-        plt.show()
+    The insert workload pushes n random keys into an empty heap; the extract
+    workload pops all n keys back out.
+    """
+    rng = random.Random(seed)
+    keys = [rng.randint(1, 10 ** 9) for _ in range(n)]
+    candidates = [('original', SwapMinHeap)] + [(f'd={d}', lambda d=d: MinHeap(d)) for d in arities]
+
+    print(f"{'heap':>10} {'insert ops/s':>14} {'extract ops/s':>14} {'insert gain':>12} {'extract gain':>13}")
+    baseline = None
+    for name, make in candidates:
+        heap = make()
+        start = time.perf_counter()
+        for key in keys:
+            heap.insert(key)
+        insert_rate = n / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for _ in range(n):
+            heap.extract_min()
+        extract_rate = n / (time.perf_counter() - start)
+
+        baseline = baseline or (insert_rate, extract_rate)
+        print(f"{name:>10} {insert_rate:>14,.0f} {extract_rate:>14,.0f} "
+              f"{insert_rate / baseline[0]:>11.2f}x {extract_rate / baseline[1]:>12.2f}x")
+
+
+def run_quiet(n, show=10, output=None, batch=100000, compact=False, draw_to=None, max_depth=None):
+    """
+    Streaming driver for large n: no per-insert printing and no drawing.
+
+    Builds the heap in O(n) with from_iterable, prints the smallest keys and
+    the timings, and optionally streams the sorted keys to a file in batches.
+    compact stores the keys in an ArrayMinHeap (8 bytes per key); draw_to
+    writes a snapshot of the heap (down to max_depth) to an image file.
+    """
+    start = time.perf_counter()
+    random_elements = array('q') if compact else []
+    for offset in range(0, n, batch):
+        random_elements.extend(random.choices(range(1, 101), k=min(batch, n - offset)))
+    print(f"Generated {n} elements in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    min_heap = (ArrayMinHeap if compact else MinHeap).from_iterable(random_elements)
+    del random_elements
+    print(f"Built heap in {time.perf_counter() - start:.2f}s")
+    print(f"{show} smallest:", min_heap.nsmallest(show))
+
+    if draw_to:
+        start = time.perf_counter()
+        min_heap.draw(max_depth=max_depth, path=draw_to)
+        print(f"Drew heap to {draw_to} in {time.perf_counter() - start:.2f}s")
+
+    if output:
+        start = time.perf_counter()
+        with open(output, 'w') as f:
+            while min_heap.heap:
+                f.write('\n'.join(map(str, min_heap.pop_many(batch))))
+                f.write('\n')
+        print(f"Wrote sorted elements to {output} in {time.perf_counter() - start:.2f}s")
 
 
 # Example usage:
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Min heap demo")
+    parser.add_argument('-n', type=int, help="number of elements (asked for when omitted)")
+    parser.add_argument('--quiet', action='store_true', help="summary output only, for large n")
+    parser.add_argument('--show', type=int, default=10, help="smallest elements to print in quiet mode")
+    parser.add_argument('--output', help="in quiet mode, stream the sorted elements to this file")
+    parser.add_argument('--compact', action='store_true', help="in quiet mode, store keys in a typed array")
+    parser.add_argument('--draw-to', help="in quiet mode, write a drawing of the heap to this image file")
+    parser.add_argument('--max-depth', type=int, help="deepest heap level to draw")
+    parser.add_argument('--bench', action='store_true', help="benchmark the heap variants and exit")
+    parser.add_argument('--stress', action='store_true', help="benchmark the concurrent front-ends and exit")
+    parser.add_argument('--mst', action='store_true', help="compare Prim's and Kruskal's MST and exit")
+    args = parser.parse_args()
+
+    if args.mst:
+        benchmark_mst()
+        raise SystemExit
+
+    if args.stress:
+        benchmark_concurrent(args.n or 200000)
+        raise SystemExit
+
+    if args.bench:
+        benchmark_heaps(args.n or 200000)
+        raise SystemExit
+
+    if args.quiet:
+        run_quiet(args.n or 10 ** 7, args.show, args.output, compact=args.compact,
+                  draw_to=args.draw_to, max_depth=args.max_depth)
+        raise SystemExit
+
     # Ask the user for the number of random elements to generate
-    n = int(input("Enter the number of elements to generate: "))
+    n = args.n if args.n is not None else int(input("Enter the number of elements to generate: "))
     # Generate n random integers between 1 and 100
     random_elements = [random.randint(1, 100) for _ in range(n)]
     print("Generated elements:", random_elements)
@@ -0,0 +1,249 @@
+import mmap
+import os
+import time
+from multiprocessing import Pool, shared_memory
+
+import networkx as nx
+import numpy as np
+
+from graph_creation import DisjointSet, edge_order, generate_weighted_edges, graph_to_edge_arrays, kruskal_edges
+
+# Shared arrays mapped into a worker process by _attach: name -> (SharedMemory, ndarray)
+_shared = {}
+
+
+def _share(array):
+    """Copies an array into a new shared memory block and returns (block, view)."""
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    view[:] = array
+    return shm, view
+
+
+def _file_spec(array):
+    """(file name, offset, shape, dtype) of an array mapped from a file with np.memmap, else None."""
+    if isinstance(array, np.memmap) and isinstance(array.base, mmap.mmap):
+        return array.filename, array.offset, array.shape, array.dtype
+    return None
+
+
+def _attach(specs, files=None):
+    """
+    Pool initializer: maps the parent's shared arrays into this worker without copying.
+
+    Arrays in files were memory-mapped from a file by the parent (e.g. a graph
+    opened with CSRGraph.load); the worker maps the same file, so all
+    processes share its pages in the OS page cache.
+    """
+    for key, (filename, offset, shape, dtype) in (files or {}).items():
+        _shared[key] = (None, np.memmap(filename, dtype=dtype, mode='r', offset=offset, shape=shape))
+    for key, (name, shape, dtype) in specs.items():
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python < 3.13: the worker registers the block with the resource
+            # tracker it shares with the parent, which unlinks it once at the end.
+            shm = shared_memory.SharedMemory(name=name)
+        _shared[key] = (shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf))
+
+
+def _lightest_per_component(keys, ranks, num_nodes, num_edges):
+    """
+    Keeps the lightest edge for every component key.
+
+    Edges are compared by their rank in the stable weight order, which is
+    unique and breaks ties by edge index, so Borůvka picks the same tree as
+    Kruskal. np.minimum.at scatters the ranks into one slot per node label,
+    so no sort is needed.
+
+    Returns:
+      tuple: (keys, ranks) with one entry per component that has an edge.
+    """
+    best = np.full(num_nodes, num_edges, dtype=np.int64)
+    np.minimum.at(best, keys, ranks)
+    keys = np.flatnonzero(best < num_edges)
+    return keys, best[keys]
+
+
+def _cheapest_edges(comp, u, v, rank, start, stop):
+    """Finds the rank of the cheapest outgoing edge of every component within edges[start:stop]."""
+    cu = comp[u[start:stop]]
+    cv = comp[v[start:stop]]
+    outgoing = np.flatnonzero(cu != cv)
+    ranks = rank[start:stop][outgoing]
+    keys = np.concatenate([cu[outgoing], cv[outgoing]])
+    return _lightest_per_component(keys, np.concatenate([ranks, ranks]), len(comp), len(rank))
+
+
+def _worker_cheapest(bounds):
+    start, stop = bounds
+    return _cheapest_edges(_shared['comp'][1], _shared['u'][1], _shared['v'][1],
+                           _shared['rank'][1], start, stop)
+
+
+def boruvka_edges(num_nodes, u, v, weights, workers=None, partitions_per_worker=4):
+    """
+    Borůvka's MST algorithm with the cheapest-edge search spread over a process pool.
+
+    The edges are ranked once with the stable weight order of kruskal_edges,
+    so the rounds compare integer ranks instead of sorting by weight. The
+    endpoint arrays, the ranks and the component labels live in shared
+    memory; endpoint arrays that are already memory-mapped files (see
+    CSRGraph.load) are mapped by the workers directly instead of being
+    copied. Every round the workers each scan a slice of the edges and report
+    the cheapest outgoing edge per component; the parent merges those
+    reports, joins the components and publishes the new labels for the next
+    round. The join is vectorized:
+    every component is hooked onto its neighbour in the union-find parent
+    array and DisjointSet.compress relabels all of them in bulk, so no
+    Python code runs per edge.
+
+    Parameters:
+      num_nodes (int): Number of nodes.
+      u, v (array): Endpoints of every edge.
+      weights (array): Weight of every edge.
+      workers (int, optional): Number of worker processes. Defaults to the core count;
+        1 runs everything in the current process.
+      partitions_per_worker (int): Number of edge slices handed to each worker per round.
+
+    Returns:
+      numpy array: Indices of the MST edges, in the same order as kruskal_edges.
+    """
+    files = {key: spec for key, spec in (('u', _file_spec(u)), ('v', _file_spec(v))) if spec is not None}
+    u = np.ascontiguousarray(u)
+    v = np.ascontiguousarray(v)
+    # order[r] is the edge of rank r; the workers only compare ranks
+    order = edge_order(weights)
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    workers = workers or os.cpu_count() or 1
+    num_edges = len(u)
+    num_parts = max(1, min(workers * partitions_per_worker, num_edges))
+    cuts = np.linspace(0, num_edges, num_parts + 1).astype(np.int64).tolist()
+    bounds = list(zip(cuts[:-1], cuts[1:]))
+
+    blocks = []
+    pool = None
+    try:
+        if workers > 1:
+            specs = {}
+            for key, array in (('u', u), ('v', v), ('rank', rank),
+                               ('comp', np.arange(num_nodes, dtype=np.int64))):
+                if key in files:
+                    continue
+                shm, view = _share(array)
+                blocks.append(shm)
+                specs[key] = (shm.name, array.shape, array.dtype)
+                if key == 'comp':
+                    comp = view
+            pool = Pool(workers, initializer=_attach, initargs=(specs, files))
+        else:
+            comp = np.arange(num_nodes, dtype=np.int64)
+
+        ds = DisjointSet(num_nodes)
+        selected = []
+        while True:
+            if pool is not None:
+                results = pool.map(_worker_cheapest, bounds)
+            else:
+                results = [_cheapest_edges(comp, u, v, rank, start, stop) for start, stop in bounds]
+            keys = np.concatenate([r[0] for r in results])
+            ranks = np.concatenate([r[1] for r in results])
+            keys, ranks = _lightest_per_component(keys, ranks, num_nodes, num_edges)
+            if ranks.size == 0:
+                break
+            # Edge ranks are unique, so the chosen edges never close a cycle; the
+            # only overlap is two components choosing the same edge.
+            selected.append(np.unique(ranks))
+            best = order[ranks]
+            # Hook every component onto the component at the far end of its edge.
+            # A shared edge makes a 2-cycle, which the smaller label breaks by
+            # staying a root; compress then relabels all components at once.
+            ends_u = comp[u[best]]
+            target = np.where(ends_u == keys, comp[v[best]], ends_u)
+            hooks = ds.parent
+            hooks[keys] = target
+            mutual = hooks[target] == keys
+            roots = keys[mutual & (keys < target)]
+            hooks[roots] = roots
+            comp[:] = ds.compress()
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+    if not selected:
+        return np.zeros(0, dtype=np.int64)
+    # Ascending rank is the order in which Kruskal accepts the edges
+    return order[np.sort(np.concatenate(selected))]
+
+
+def boruvka_mst(G, workers=None):
+    """
+    Computes the MST of a NetworkX graph with the parallel Borůvka engine.
+
+    Parameters:
+      G (NetworkX Graph): A weighted graph.
+      workers (int, optional): Number of worker processes.
+
+    Returns:
+      NetworkX Graph: The same tree as kruskal_mst(G).
+    """
+    nodes, u, v, weights = graph_to_edge_arrays(G)
+    mst = boruvka_edges(len(nodes), u, v, weights, workers=workers)
+
+    T = nx.Graph()
+    T.add_nodes_from(G.nodes())
+    T.add_weighted_edges_from(zip([nodes[i] for i in u[mst].tolist()],
+                                  [nodes[i] for i in v[mst].tolist()],
+                                  weights[mst].tolist()))
+    return T
+
+
+def benchmark(num_nodes, edge_probability, min_weight=1, max_weight=10, seed=0, max_workers=None):
+    """
+    Times Borůvka for 1, 2, 4, ... workers against sequential Kruskal and prints the speedups.
+
+    Parameters:
+      num_nodes (int): Number of nodes in the generated graph.
+      edge_probability (float): Probability that an edge exists between any two nodes.
+      min_weight, max_weight (int): Range of the edge weights.
+      seed (int): Seed for the graph generator.
+      max_workers (int, optional): Largest worker count to try. Defaults to the core count.
+    """
+    u, v, weights = generate_weighted_edges(num_nodes, edge_probability, min_weight, max_weight, seed)
+    print(f"Graph: {num_nodes} nodes, {len(u)} edges, {os.cpu_count()} cores")
+
+    start = time.perf_counter()
+    reference = kruskal_edges(num_nodes, u, v, weights)
+    kruskal_time = time.perf_counter() - start
+    print(f"Kruskal (sequential): {kruskal_time:.3f}s")
+
+    max_workers = max_workers or os.cpu_count() or 1
+    counts = []
+    workers = 1
+    while workers < max_workers:
+        counts.append(workers)
+        workers *= 2
+    counts.append(max_workers)
+
+    base_time = None
+    for workers in counts:
+        start = time.perf_counter()
+        mst = boruvka_edges(num_nodes, u, v, weights, workers=workers)
+        elapsed = time.perf_counter() - start
+        if not np.array_equal(mst, reference):
+            raise RuntimeError(f"Borůvka with {workers} workers disagrees with Kruskal")
+        if base_time is None:
+            # The single-process baseline shows what the pool has to make up against Kruskal
+            base_time = elapsed
+            print(f"Borůvka (1 worker, no pool): {elapsed:.3f}s, {elapsed / kruskal_time:.2f}x Kruskal's time")
+            print(f"{'workers':>8} {'time (s)':>10} {'speedup':>8} {'vs Kruskal':>11}")
+        print(f"{workers:>8} {elapsed:>10.3f} {base_time / elapsed:>8.2f} {kruskal_time / elapsed:>11.2f}")
+
+
+if __name__ == '__main__':
+    benchmark(num_nodes=200000, edge_probability=5e-5)
@@ -0,0 +1,544 @@
+import json
+import os
+import tempfile
+import time
+from itertools import islice
+
+import networkx as nx
+import numpy as np
+
+# Version written to meta.json by CSRGraph.save
+CSR_FORMAT_VERSION = 1
+
+
+class CSRGraph:
+    """
+    Directed graph in compressed sparse row (CSR) form over the node ids 0..n-1.
+
+    The successors of node i are targets[offsets[i]:offsets[i + 1]] and
+    weights, when present, run parallel to targets. nodes maps ids back to the
+    original labels. Edges keep their input order within each node, matching
+    the NetworkX adjacency order. An undirected graph stores every edge once,
+    in one direction, and has directed set to False; symmetrized adds the
+    reverse arcs for the traversal code.
+    """
+
+    def __init__(self, offsets, targets, nodes=None, weights=None, directed=True):
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.nodes = nodes if nodes is not None else range(len(offsets) - 1)
+        self.directed = directed
+        self._transposed = None
+
+    @classmethod
+    def from_edges(cls, u, v, num_nodes=None, weights=None, nodes=None, directed=True):
+        """
+        Builds the CSR adjacency from edge arrays.
+
+        A counting pass (bincount + cumsum) gives the row offsets and a stable
+        argsort on the sources places every edge in its row.
+
+        Parameters:
+          u, v (array): Source and target ids of every edge.
+          num_nodes (int, optional): Number of nodes. Defaults to the largest id plus one.
+          weights (array, optional): Weight of every edge.
+          nodes (sequence, optional): Node labels indexed by id.
+          directed (bool): False when every edge stands for both directions.
+        """
+        u = np.asarray(u, dtype=np.int64)
+        v = np.asarray(v, dtype=np.int64)
+        if num_nodes is None:
+            num_nodes = len(nodes) if nodes is not None else int(max(u.max(initial=-1), v.max(initial=-1))) + 1
+        offsets = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(u, minlength=num_nodes), out=offsets[1:])
+        order = np.argsort(u, kind='stable')
+        return cls(offsets, v[order], nodes, None if weights is None else np.asarray(weights)[order], directed)
+
+    @classmethod
+    def from_networkx(cls, G, weight=None):
+        """
+        Builds the CSR adjacency of a NetworkX graph.
+
+        Parameters:
+          G (NetworkX DiGraph): The graph; undirected graphs give one direction per edge.
+          weight (str, optional): Edge attribute to store as weights.
+        """
+        nodes = list(G.nodes())
+        index = {node: i for i, node in enumerate(nodes)}
+        if weight is None:
+            edges = list(G.edges())
+            weights = None
+        else:
+            edges = list(G.edges(data=weight))
+            weights = np.array([w for _, _, w in edges])
+        u = np.fromiter((index[e[0]] for e in edges), dtype=np.int64, count=len(edges))
+        v = np.fromiter((index[e[1]] for e in edges), dtype=np.int64, count=len(edges))
+        return cls.from_edges(u, v, len(nodes), weights, nodes, G.is_directed())
+
+    @classmethod
+    def from_graph(cls, graph, num_nodes=None, symmetrize=True):
+        """
+        Accepts a CSRGraph, a NetworkX graph, the path of a saved CSR graph (see save),
+        a pair of arrays (u, v) or an (m, 2) edge array.
+
+        Undirected graphs come back as directed graphs with both arcs of every
+        edge, so the SCC, reachability and DFS code can follow an edge either
+        way. Edge arrays are always read as directed.
+
+        Parameters:
+          graph: The graph, in one of the forms above.
+          num_nodes (int, optional): Number of nodes for edge arrays.
+          symmetrize (bool): False keeps one direction per undirected edge, for
+            code that only needs every edge once, such as Kruskal's algorithm.
+        """
+        if isinstance(graph, cls):
+            return graph.symmetrized() if symmetrize else graph
+        if isinstance(graph, (str, os.PathLike)):
+            csr = cls.load(graph)
+            return csr.symmetrized() if symmetrize else csr
+        if isinstance(graph, nx.Graph):
+            if symmetrize and not graph.is_directed():
+                # The directed view lists both arcs in NetworkX adjacency order without copying G
+                graph = graph.to_directed(as_view=True)
+            return cls.from_networkx(graph)
+        if isinstance(graph, tuple):
+            u, v = graph
+        else:
+            edges = np.asarray(graph, dtype=np.int64).reshape(-1, 2)
+            u, v = edges[:, 0], edges[:, 1]
+        return cls.from_edges(u, v, num_nodes)
+
+    @property
+    def num_nodes(self):
+        return len(self.offsets) - 1
+
+    @property
+    def num_edges(self):
+        return len(self.targets)
+
+    def sources(self):
+        """Returns the source id of every edge, parallel to targets."""
+        return np.repeat(np.arange(self.num_nodes, dtype=np.int64), np.diff(self.offsets))
+
+    def successors(self, i):
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def edge_arrays(self):
+        """
+        Returns the edges as (u, v, weights) arrays, in CSR order, as the MST code expects them.
+
+        v and weights are the stored arrays themselves (memory maps for a loaded graph).
+        """
+        return self.sources(), self.targets, self.weights
+
+    def symmetrized(self):
+        """
+        Returns the directed graph with both arcs of every edge, or self when already directed.
+
+        Row i lists the stored successors of i first, then the sources of the
+        edges that point at i. Self-loops are not doubled. The node labels
+        are shared with this graph.
+        """
+        if self.directed:
+            return self
+        u = self.sources()
+        v = np.asarray(self.targets, dtype=np.int64)
+        back = u != v
+        weights = None
+        if self.weights is not None:
+            weights = np.concatenate([self.weights, np.asarray(self.weights)[back]])
+        return CSRGraph.from_edges(np.concatenate([u, v[back]]), np.concatenate([v, u[back]]),
+                                   self.num_nodes, weights, self.nodes)
+
+    def transpose(self):
+        """
+        Returns the reversed graph G^R, built once from the same arrays and cached.
+
+        The reversed rows list the predecessors in the order their edges
+        appear in this graph, which is the order G.reverse() gives in NetworkX.
+        The transpose shares the node labels and points back at this graph.
+        """
+        if self._transposed is None:
+            transposed = CSRGraph.from_edges(self.targets, self.sources(), self.num_nodes,
+                                             self.weights, self.nodes, self.directed)
+            transposed._transposed = self
+            self._transposed = transposed
+        return self._transposed
+
+    def save(self, path):
+        """
+        Writes the graph to a directory in the binary CSR file format.
+
+        The directory holds raw little-endian arrays that load can map
+        without parsing:
+          - offsets.bin: int64 row offsets, num_nodes + 1 of them;
+          - targets.bin: target ids, int32 when the node count allows, otherwise int64;
+          - weights.bin: the weights in their own dtype, if the graph has any;
+          - labels.bin and label_offsets.bin: the node-label table, one JSON value per
+            node and the int64 byte offset of each, if the labels are not 0..n-1.
+            Tuples are stored as JSON arrays and read back as tuples; labels of any
+            other type that JSON cannot reproduce raise ValueError;
+          - meta.json: counts, dtypes and whether the graph is directed.
+        meta.json is written last, so a directory without it is incomplete.
+
+        Parameters:
+          path (str): Directory to write; created if missing.
+        """
+        os.makedirs(path, exist_ok=True)
+        target_dtype = np.dtype(np.int32 if self.num_nodes < 2 ** 31 else np.int64).newbyteorder('<')
+        np.asarray(self.offsets, dtype='<i8').tofile(os.path.join(path, 'offsets.bin'))
+        np.asarray(self.targets, dtype=target_dtype).tofile(os.path.join(path, 'targets.bin'))
+        weight_dtype = None
+        if self.weights is not None:
+            weights = np.asarray(self.weights)
+            weights = weights.astype(weights.dtype.newbyteorder('<'))
+            weights.tofile(os.path.join(path, 'weights.bin'))
+            weight_dtype = weights.dtype.str
+        has_labels = _has_labels(self.nodes, self.num_nodes)
+        if has_labels:
+            _write_labels(path, self.nodes)
+        meta = {'version': CSR_FORMAT_VERSION, 'num_nodes': self.num_nodes, 'num_edges': self.num_edges,
+                'directed': self.directed, 'target_dtype': target_dtype.str, 'weight_dtype': weight_dtype,
+                'labels': has_labels}
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def load(cls, path, mode='r'):
+        """
+        Opens a graph written by save or import_edge_list with np.memmap.
+
+        Nothing is read up front: the arrays are mapped from the files, pages
+        are loaded on first access and shared with every other process that
+        maps the same files. Node labels are decoded when they are read.
+
+        Parameters:
+          path (str): Directory of the graph.
+          mode (str): np.memmap mode; 'r+' allows changing the weights in place.
+
+        Returns:
+          CSRGraph: The graph, backed by the files.
+        """
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        if meta['version'] != CSR_FORMAT_VERSION:
+            raise ValueError(f"Unsupported CSR file version {meta['version']} in {path}")
+        n, m = meta['num_nodes'], meta['num_edges']
+        offsets = _map(os.path.join(path, 'offsets.bin'), '<i8', n + 1, mode)
+        targets = _map(os.path.join(path, 'targets.bin'), meta['target_dtype'], m, mode)
+        weights = None
+        if meta['weight_dtype'] is not None:
+            weights = _map(os.path.join(path, 'weights.bin'), meta['weight_dtype'], m, mode)
+        nodes = _Labels(path, n) if meta['labels'] else None
+        return cls(offsets, targets, nodes, weights, meta['directed'])
+
+    def to_networkx(self):
+        """Converts back to a NetworkX DiGraph (Graph when undirected), e.g. for drawing."""
+        G = nx.DiGraph() if self.directed else nx.Graph()
+        G.add_nodes_from(self.nodes)
+        labels = list(self.nodes)
+        u = self.sources().tolist()
+        v = self.targets.tolist()
+        if self.weights is None:
+            G.add_edges_from((labels[a], labels[b]) for a, b in zip(u, v))
+        else:
+            G.add_weighted_edges_from((labels[a], labels[b], w)
+                                      for a, b, w in zip(u, v, self.weights.tolist()))
+        return G
+
+
+def _map(path, dtype, count, mode='r'):
+    if count == 0:
+        # np.memmap cannot map empty files
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode=mode, shape=(count,))
+
+
+def _decode_label(value):
+    """Turns JSON arrays back into tuples: labels are hashable, so an array can only have been a tuple."""
+    if isinstance(value, list):
+        return tuple(_decode_label(item) for item in value)
+    return value
+
+
+def _encode_label(node):
+    """JSON text of a node label, refusing labels that would not decode to an equal value."""
+    try:
+        text = json.dumps(node)
+    except (TypeError, ValueError):
+        text = None
+    if text is None or _decode_label(json.loads(text)) != node:
+        raise ValueError(f"Node label {node!r} cannot be saved: the label table holds strings, numbers, "
+                         f"booleans, None and (nested) tuples of them")
+    return text.encode() + b'\n'
+
+
+def _has_labels(nodes, num_nodes):
+    """Whether the node labels differ from the ids 0..num_nodes-1 and need a label table."""
+    if isinstance(nodes, range):
+        return nodes != range(num_nodes)
+    return not np.array_equal(np.asarray(nodes, dtype=object), np.arange(num_nodes))
+
+
+def _write_labels(path, nodes, chunk=1 << 16):
+    """Writes the node-label table: JSON values separated by newlines, plus their byte offsets."""
+    offsets = [0]
+    with open(os.path.join(path, 'labels.bin'), 'wb') as f:
+        nodes = iter(nodes)
+        while True:
+            encoded = [_encode_label(node) for node in islice(nodes, chunk)]
+            if not encoded:
+                break
+            f.write(b''.join(encoded))
+            offsets.extend((offsets[-1] + np.cumsum([len(e) for e in encoded])).tolist())
+    np.array(offsets, dtype='<i8').tofile(os.path.join(path, 'label_offsets.bin'))
+
+
+class _Labels:
+    """Read-only sequence of the node labels of a saved graph, decoded when an index is read."""
+
+    def __init__(self, path, num_nodes):
+        self.offsets = _map(os.path.join(path, 'label_offsets.bin'), '<i8', num_nodes + 1)
+        self.data = _map(os.path.join(path, 'labels.bin'), np.uint8, int(self.offsets[-1]) if num_nodes else 0)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('label index out of range')
+        return _decode_label(json.loads(self.data[self.offsets[i]:self.offsets[i + 1]].tobytes()))
+
+    def __iter__(self, chunk=1 << 16):
+        # Decode many labels per call instead of one at a time
+        for start in range(0, len(self), chunk):
+            stop = min(start + chunk, len(self))
+            text = self.data[self.offsets[start]:self.offsets[stop]].tobytes().decode()
+            yield from _decode_label(json.loads('[' + text.rstrip('\n').replace('\n', ',') + ']'))
+
+
+def import_edge_list(text_path, path, num_nodes=None, weighted=True, weight_dtype=np.float64,
+                     directed=True, buffer_edges=1_000_000):
+    """
+    Converts a text edge list into the binary CSR file format without holding the edges in memory.
+
+    The file has one "u v" or "u v weight" line per edge with integer node
+    ids, as written by external_kruskal.write_edge_list or
+    nx.write_weighted_edgelist; '#' starts a comment. The first pass parses
+    buffer_edges lines at a time, counts the out-degrees and spills the
+    parsed columns to temporary binary files. The second pass turns the
+    degrees into row offsets and scatters every chunk into the mapped
+    targets and weights files, keeping the input order within each row, so
+    the result equals CSRGraph.from_edges on the whole list. Memory is
+    bounded by the node count plus buffer_edges edges.
+
+    Parameters:
+      text_path (str): Text edge list.
+      path (str): Directory to write the graph to (see CSRGraph.save).
+      num_nodes (int, optional): Number of nodes. Defaults to the largest id in the file plus one.
+      weighted (bool): Read the third column as the weights.
+      weight_dtype (numpy dtype): Type used to parse the weights.
+      directed (bool): Whether the edges are directed.
+      buffer_edges (int): Number of edges parsed and placed at once.
+
+    Returns:
+      CSRGraph: The imported graph, opened with CSRGraph.load.
+    """
+    os.makedirs(path, exist_ok=True)
+    columns = [('u', np.int64), ('v', np.int64)] + ([('w', weight_dtype)] if weighted else [])
+    degrees = np.zeros(0, dtype=np.int64)
+    num_edges = 0
+    max_node = -1
+    with tempfile.TemporaryDirectory(dir=path) as spill_dir:
+        spills = {name: open(os.path.join(spill_dir, f'{name}.bin'), 'wb') for name, _ in columns}
+        try:
+            with open(text_path) as f:
+                while True:
+                    lines = list(islice(f, buffer_edges))
+                    if not lines:
+                        break
+                    edges = np.loadtxt(lines, dtype=columns, usecols=range(len(columns)), ndmin=1)
+                    if edges.size == 0:
+                        continue
+                    max_node = max(max_node, int(edges['u'].max()), int(edges['v'].max()))
+                    counts = np.bincount(edges['u'])
+                    if len(counts) > len(degrees):
+                        degrees = np.concatenate([degrees, np.zeros(len(counts) - len(degrees), dtype=np.int64)])
+                    degrees[:len(counts)] += counts
+                    for name, _ in columns:
+                        edges[name].tofile(spills[name])
+                    num_edges += edges.size
+        finally:
+            for spill in spills.values():
+                spill.close()
+
+        n = max_node + 1 if num_nodes is None else num_nodes
+        if max_node >= n:
+            raise ValueError(f"Node id {max_node} in {text_path} does not fit num_nodes={n}")
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(degrees, out=offsets[1:len(degrees) + 1])
+        offsets[len(degrees) + 1:] = offsets[len(degrees)]
+        target_dtype = np.dtype(np.int32 if n < 2 ** 31 else np.int64).newbyteorder('<')
+        weight_type = np.dtype(weight_dtype).newbyteorder('<')
+        targets = _create(os.path.join(path, 'targets.bin'), target_dtype, num_edges)
+        weights = _create(os.path.join(path, 'weights.bin'), weight_type, num_edges) if weighted else None
+
+        # Next free slot of every row
+        cursor = offsets[:-1].copy()
+        readers = {name: open(os.path.join(spill_dir, f'{name}.bin'), 'rb') for name, _ in columns}
+        try:
+            while True:
+                u = np.fromfile(readers['u'], dtype=np.int64, count=buffer_edges)
+                if u.size == 0:
+                    break
+                v = np.fromfile(readers['v'], dtype=np.int64, count=u.size)
+                order = np.argsort(u, kind='stable')
+                su = u[order]
+                # Rank of every edge among the chunk's edges of the same row
+                starts = np.flatnonzero(np.concatenate([[True], su[1:] != su[:-1]]))
+                counts = np.diff(np.append(starts, su.size))
+                slots = cursor[su] + np.arange(su.size) - np.repeat(starts, counts)
+                targets[slots] = v[order]
+                if weighted:
+                    weights[slots] = np.fromfile(readers['w'], dtype=weight_dtype, count=u.size)[order]
+                cursor[su[starts]] += counts
+        finally:
+            for reader in readers.values():
+                reader.close()
+        for array in (targets, weights):
+            if isinstance(array, np.memmap):
+                array.flush()
+        del targets, weights
+
+    offsets.astype('<i8').tofile(os.path.join(path, 'offsets.bin'))
+    meta = {'version': CSR_FORMAT_VERSION, 'num_nodes': n, 'num_edges': num_edges, 'directed': directed,
+            'target_dtype': target_dtype.str, 'weight_dtype': weight_type.str if weighted else None,
+            'labels': False}
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+    return CSRGraph.load(path)
+
+
+def _create(path, dtype, count):
+    """Creates a file of count values to be filled through a writable memory map."""
+    if count == 0:
+        open(path, 'wb').close()
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='w+', shape=(count,))
+
+
+def benchmark_csr_file(num_nodes=1_000_000, average_degree=8, seed=0, path=None):
+    """
+    Compares loading a weighted graph from a text edge list with opening its binary CSR file.
+
+    Parameters:
+      num_nodes (int): Number of nodes in the random graph.
+      average_degree (int): Edges per node.
+      seed (int): Seed for the graph.
+      path (str, optional): Working directory. Defaults to a temporary one.
+    """
+    rng = np.random.default_rng(seed)
+    m = num_nodes * average_degree
+    u = rng.integers(0, num_nodes, m)
+    v = rng.integers(0, num_nodes, m)
+    weights = rng.integers(1, 100, m)
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = path or work_dir
+        text_path = os.path.join(path, 'edges.txt')
+        np.savetxt(text_path, np.column_stack([u, v, weights]), fmt='%d', delimiter=' ')
+        print(f"{m} edges, text edge list {os.path.getsize(text_path) / 2 ** 20:.0f} MB")
+
+        start = time.perf_counter()
+        np.loadtxt(text_path, dtype=np.int64)
+        print(f"Parse text with np.loadtxt: {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        graph = import_edge_list(text_path, os.path.join(path, 'graph'), weight_dtype=np.int64)
+        print(f"Streaming import: {time.perf_counter() - start:.2f}s")
+        del graph
+
+        start = time.perf_counter()
+        graph = CSRGraph.load(os.path.join(path, 'graph'))
+        print(f"Open binary CSR: {(time.perf_counter() - start) * 1e3:.2f} ms")
+        start = time.perf_counter()
+        total = int(graph.weights.sum())
+        print(f"First full pass over the weights: {time.perf_counter() - start:.3f}s (sum {total})")
+        del graph
+
+
+def check_label_round_trip(path=None):
+    """
+    Saves graphs with string and tuple node labels, reloads them and checks that
+    the labels and the NetworkX conversion come back unchanged.
+
+    Parameters:
+      path (str, optional): Working directory. Defaults to a temporary one.
+    """
+    graphs = [nx.grid_2d_graph(2, 2).to_directed(),
+              nx.DiGraph([('a', ('b', (1, 2.5))), (('b', (1, 2.5)), True), (True, 'a')])]
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = path or work_dir
+        for k, G in enumerate(graphs):
+            graph_path = os.path.join(path, f'graph_{k}')
+            CSRGraph.from_networkx(G).save(graph_path)
+            loaded = CSRGraph.load(graph_path)
+            if list(loaded.nodes) != list(G.nodes()) or loaded.nodes[0] != next(iter(G.nodes())):
+                raise RuntimeError(f"Node labels changed on the round trip: {list(loaded.nodes)}")
+            if not nx.utils.graphs_equal(loaded.to_networkx(), G):
+                raise RuntimeError("The reloaded graph differs from the saved one")
+            del loaded
+        try:
+            CSRGraph.from_networkx(nx.DiGraph([(frozenset({1}), 2)])).save(os.path.join(path, 'bad'))
+        except ValueError:
+            pass
+        else:
+            raise RuntimeError("A frozenset label was saved although it cannot be read back")
+    print("Node labels survive the round trip")
+
+
+def check_undirected_graphs(num_nodes=200, num_edges=600, seed=0, path=None):
+    """
+    Checks that from_graph gives both arcs of every undirected edge, for a
+    NetworkX Graph and for a saved CSR graph with directed=False.
+
+    Parameters:
+      num_nodes (int): Number of nodes in the random graph.
+      num_edges (int): Number of edges drawn (with a self-loop and duplicates allowed).
+      seed (int): Seed for the graph.
+      path (str, optional): Working directory. Defaults to a temporary one.
+    """
+    rng = np.random.default_rng(seed)
+    u = rng.integers(0, num_nodes, num_edges)
+    v = rng.integers(0, num_nodes, num_edges)
+    u[0] = v[0]
+    weights = rng.integers(1, 100, num_edges)
+    G = nx.Graph()
+    G.add_nodes_from(range(num_nodes))
+    G.add_weighted_edges_from(zip(u.tolist(), v.tolist(), weights.tolist()))
+    expected = G.to_directed()
+    with tempfile.TemporaryDirectory() as work_dir:
+        graph_path = os.path.join(path or work_dir, 'graph')
+        CSRGraph.from_networkx(G, weight='weight').save(graph_path)
+        cases = [(G, expected), (graph_path, expected), (nx.Graph([(0, 1)]), nx.DiGraph([(0, 1), (1, 0)]))]
+        for graph, H in cases:
+            csr = CSRGraph.from_graph(graph)
+            arcs = list(zip(csr.sources().tolist(), csr.targets.tolist()))
+            if not csr.directed or sorted(arcs) != sorted(H.edges()):
+                raise RuntimeError(f"from_graph lost the reverse arcs of an undirected graph ({graph!r:.40})")
+            if csr.weights is not None and any(H[a][b]['weight'] != w
+                                               for (a, b), w in zip(arcs, csr.weights.tolist())):
+                raise RuntimeError("A reverse arc got the wrong weight")
+            del csr
+    print("Undirected graphs are read with both arcs of every edge")
+
+
+# Example usage:
+if __name__ == '__main__':
+    check_label_round_trip()
+    check_undirected_graphs()
+    benchmark_csr_file()
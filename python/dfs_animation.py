@@ -0,0 +1,333 @@
+import os
+import shutil
+import subprocess
+import tempfile
+from array import array
+from multiprocessing import Pool
+
+import matplotlib.animation as animation
+import networkx as nx
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import to_rgba_array
+from matplotlib.figure import Figure
+from PIL import Image
+
+from csr_graph import CSRGraph
+from scc import FINISH, _kosaraju_trace, _tarjan_trace
+
+# Node states in a DFS animation, with the colors the step dicts map to
+UNVISITED, VISITED, ON_STACK, CURRENT, FINISHED = range(5)
+STATE_COLORS = ('white', 'lightblue', 'yellow', 'red', 'gray')
+
+
+class DiffTrace:
+    """
+    DFS animation steps stored as diffs.
+
+    Step k changes the states of the node ids
+    change_nodes[offsets[k]:offsets[k + 1]] to the matching change_states
+    and has the title titles[k]. A step usually touches two nodes (the new
+    current node and the one it replaces), so the trace grows with the number
+    of steps rather than with steps times nodes like the visited/finished sets
+    of kosaraju_steps.
+    """
+
+    def __init__(self, nodes, offsets, change_nodes, change_states, titles):
+        self.nodes = nodes
+        self.offsets = offsets
+        self.change_nodes = change_nodes
+        self.change_states = change_states
+        self.titles = titles
+
+    @classmethod
+    def from_trace(cls, nodes, trace):
+        """
+        Builds the diffs from trace records (see scc._kosaraju_trace).
+
+        The states follow the colors of the animation scripts: the current
+        node is CURRENT, the rest of the DFS stack ON_STACK and finished nodes
+        FINISHED. A new pass resets every touched node to UNVISITED.
+        """
+        state = bytearray(len(nodes))
+        offsets = array('q', [0])
+        change_nodes = array('q')
+        change_states = array('B')
+        titles = []
+        current = -1
+        current_pass = None
+
+        def change(i, value):
+            state[i] = value
+            change_nodes.append(i)
+            change_states.append(value)
+
+        for pass_number, kind, node, _, desc, _ in trace:
+            if pass_number != current_pass:
+                if current_pass is not None:
+                    for i in np.flatnonzero(np.frombuffer(state, dtype=np.uint8)).tolist():
+                        change(i, UNVISITED)
+                current_pass = pass_number
+                current = -1
+            if current >= 0 and current != node:
+                change(current, ON_STACK)
+            if kind == FINISH:
+                change(node, FINISHED)
+                current = -1
+            else:
+                change(node, CURRENT)
+                current = node
+            offsets.append(len(change_nodes))
+            titles.append(desc)
+        return cls(nodes, np.frombuffer(offsets, dtype=np.int64),
+                   np.frombuffer(change_nodes, dtype=np.int64),
+                   np.frombuffer(change_states, dtype=np.uint8), titles)
+
+    @classmethod
+    def kosaraju(cls, graph, passes=(1, 2), num_nodes=None):
+        """Traces Kosaraju's algorithm; the arguments are those of scc.kosaraju_steps."""
+        csr = CSRGraph.from_graph(graph, num_nodes)
+        return cls.from_trace(csr.nodes, _kosaraju_trace(csr, passes))
+
+    @classmethod
+    def tarjan(cls, graph, num_nodes=None):
+        """Traces Tarjan's algorithm; the arguments are those of scc.tarjan_steps."""
+        csr = CSRGraph.from_graph(graph, num_nodes)
+        return cls.from_trace(csr.nodes, _tarjan_trace(csr))
+
+    def __len__(self):
+        return len(self.titles)
+
+    def changes(self, k):
+        """Returns (node ids, states) changed by step k."""
+        start, stop = self.offsets[k], self.offsets[k + 1]
+        return self.change_nodes[start:stop], self.change_states[start:stop]
+
+    def states_at(self, k):
+        """
+        Replays steps 0..k and returns the state of every node after step k.
+
+        Only the last change of each node counts, which np.unique finds on the
+        reversed change list in one vectorized pass.
+        """
+        states = np.zeros(len(self.nodes), dtype=np.uint8)
+        stop = self.offsets[k + 1]
+        if stop:
+            changed, last = np.unique(self.change_nodes[stop - 1::-1], return_index=True)
+            states[changed] = self.change_states[stop - 1::-1][last]
+        return states
+
+
+class TraceRenderer:
+    """
+    Draws a graph once and shows the steps of a DiffTrace on it.
+
+    Edges (and everything else that does not change) are drawn a single
+    time. Only the node collection, the title and, for small graphs, the
+    node labels are animated artists, so with blitting the cost of a frame
+    depends on the number of nodes that change and not on the edge count.
+    """
+
+    def __init__(self, trace, G, pos, ax, max_labels=200, node_size=300, **edge_kwargs):
+        """
+        Parameters:
+          trace (DiffTrace): The steps to show.
+          G (NetworkX DiGraph): The graph to draw, with the nodes of the trace.
+          pos (dict): Node positions.
+          ax (matplotlib Axes): Axes to draw on.
+          max_labels (int): Node labels are only drawn for graphs up to this size.
+          node_size (int): Marker size of the nodes.
+          **edge_kwargs: Passed on to nx.draw_networkx_edges.
+        """
+        self.trace = trace
+        self.ax = ax
+        self.palette = to_rgba_array(STATE_COLORS)
+        self.facecolors = self.palette[np.zeros(len(trace.nodes), dtype=np.intp)]
+        self.frame = -1
+
+        edge_kwargs = {'arrows': True, 'arrowstyle': '-|>', 'arrowsize': 20,
+                       'connectionstyle': 'arc3,rad=0.1', 'edge_color': 'black',
+                       'node_size': node_size, **edge_kwargs}
+        nx.draw_networkx_edges(G, pos, ax=ax, **edge_kwargs)
+        nodelist = list(trace.nodes)
+        self.collection = nx.draw_networkx_nodes(G, pos, nodelist=nodelist, node_size=node_size,
+                                                 node_color=self.facecolors, ax=ax)
+        self.collection.set_animated(True)
+        self.artists = [self.collection]
+        if len(nodelist) <= max_labels:
+            labels = nx.draw_networkx_labels(G, pos, ax=ax)
+            for text in labels.values():
+                text.set_animated(True)
+            self.artists += labels.values()
+
+        # Blitting only restores the inside of the axes, so the title lives
+        # there too, in some extra room above the nodes
+        ax.axis('off')
+        bottom, top = ax.get_ylim()
+        ax.set_ylim(bottom, top + 0.15 * (top - bottom))
+        self.title = ax.text(0.5, 0.99, '', transform=ax.transAxes, ha='center', va='top',
+                             fontsize='large', animated=True)
+        self.artists.append(self.title)
+
+    def show(self, frame):
+        """Sets the artists to step frame and returns them."""
+        if frame == self.frame + 1:
+            # Next step: apply its diff
+            ids, states = self.trace.changes(frame)
+            self.facecolors[ids] = self.palette[states]
+        else:
+            # Jump: replay the trace up to the frame
+            self.facecolors[:] = self.palette[self.trace.states_at(frame)]
+        self.frame = frame
+        self.collection.set_facecolor(self.facecolors)
+        self.title.set_text(self.trace.titles[frame])
+        return self.artists
+
+    def _reset(self):
+        self.frame = -1
+        self.facecolors[:] = self.palette[UNVISITED]
+        self.collection.set_facecolor(self.facecolors)
+        self.title.set_text('')
+        return self.artists
+
+    def animate(self, interval=1000, frames=None, **kwargs):
+        """
+        Returns a blitted FuncAnimation over the trace.
+
+        Parameters:
+          interval (int): Delay between frames in milliseconds.
+          frames (iterable, optional): Steps to show. Defaults to all of them.
+          **kwargs: Passed on to FuncAnimation.
+        """
+        frames = range(len(self.trace)) if frames is None else frames
+        return animation.FuncAnimation(self.ax.figure, self.show, frames=frames, init_func=self._reset,
+                                       interval=interval, blit=True, **{'repeat': False, **kwargs})
+
+
+# Renderer of an export worker process, set up once by _export_init
+_exporter = {}
+
+
+def _export_init(trace, G, pos, figsize, dpi, edge_kwargs):
+    """Pool initializer: draws the static figure once on an Agg canvas and keeps its background."""
+    fig = Figure(figsize=figsize, dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    renderer = TraceRenderer(trace, G, pos, ax, **edge_kwargs)
+    canvas.draw()
+    _exporter.update(canvas=canvas, ax=ax, renderer=renderer, background=canvas.copy_from_bbox(ax.bbox))
+
+
+def _export_chunk(job):
+    """Renders the frames of one chunk and writes them as numbered PNG files."""
+    frames, first, frame_dir = job
+    canvas, ax, renderer = _exporter['canvas'], _exporter['ax'], _exporter['renderer']
+    for number, frame in enumerate(frames, start=first):
+        canvas.restore_region(_exporter['background'])
+        for artist in renderer.show(frame):
+            ax.draw_artist(artist)
+        Image.fromarray(np.asarray(canvas.buffer_rgba())).convert('RGB').save(
+            os.path.join(frame_dir, f'frame_{number:06d}.png'), compress_level=1)
+    return len(frames)
+
+
+def parse_frames(text):
+    """
+    Parses a frame range "start:stop[:step]" (Python slice syntax, any part may be empty).
+
+    Returns:
+      slice: The selected frames.
+    """
+    parts = [int(part) if part else None for part in text.split(':')]
+    if len(parts) == 1:
+        return slice(parts[0], parts[0] + 1 if parts[0] != -1 else None)
+    return slice(*parts)
+
+
+def _load_frames(pattern, numbers):
+    """Yields the numbered PNG frames one at a time, loaded into memory, closing every file."""
+    for number in numbers:
+        with Image.open(pattern % number) as frame:
+            yield frame.copy()
+
+
+def export_animation(trace, G, pos, path, frames=None, dpi=100, fps=1, workers=None,
+                     figsize=(6, 4), chunks_per_worker=4, **edge_kwargs):
+    """
+    Renders a DiffTrace headless and encodes it as an MP4 or GIF file.
+
+    Frames are drawn with the Agg backend in a process pool. Every worker
+    draws the static graph once and then renders contiguous chunks of frames
+    by blitting, starting each chunk with a replay of the trace, so chunks
+    are independent and the export scales with the number of cores. The
+    PNG frames are encoded by ffmpeg for .mp4 and by Pillow for .gif.
+
+    Parameters:
+      trace (DiffTrace): The steps to export.
+      G (NetworkX DiGraph): The graph to draw.
+      pos (dict): Node positions.
+      path (str): Output file ending in .mp4 or .gif.
+      frames (slice or iterable, optional): Steps to export. Defaults to all of them.
+      dpi (int): Resolution of the frames.
+      fps (float): Frames per second of the output.
+      workers (int, optional): Number of worker processes. Defaults to the core count;
+        1 renders in the current process.
+      figsize (tuple): Figure size in inches.
+      chunks_per_worker (int): Number of frame chunks handed to each worker.
+      **edge_kwargs: Passed on to TraceRenderer.
+
+    Returns:
+      int: Number of frames written.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in ('.mp4', '.gif'):
+        raise ValueError(f"Cannot export to {path!r}: expected a .mp4 or .gif file")
+    ffmpeg = shutil.which('ffmpeg')
+    if extension == '.mp4' and ffmpeg is None:
+        raise RuntimeError("Exporting MP4 needs ffmpeg on the PATH; export a .gif instead")
+
+    if frames is None:
+        frames = slice(None)
+    if isinstance(frames, slice):
+        frames = range(len(trace))[frames]
+    frames = list(frames)
+    if not frames:
+        raise ValueError("No frames selected")
+    workers = max(1, min(workers or os.cpu_count() or 1, len(frames)))
+
+    num_chunks = min(len(frames), workers * chunks_per_worker)
+    cuts = np.linspace(0, len(frames), num_chunks + 1).astype(np.int64).tolist()
+    with tempfile.TemporaryDirectory() as frame_dir:
+        jobs = [(frames[start:stop], start, frame_dir) for start, stop in zip(cuts[:-1], cuts[1:])]
+        initargs = (trace, G, pos, figsize, dpi, edge_kwargs)
+        if workers > 1:
+            with Pool(workers, initializer=_export_init, initargs=initargs) as pool:
+                written = sum(pool.imap_unordered(_export_chunk, jobs))
+        else:
+            _export_init(*initargs)
+            written = sum(map(_export_chunk, jobs))
+            _exporter.clear()
+
+        pattern = os.path.join(frame_dir, 'frame_%06d.png')
+        if extension == '.mp4':
+            # libx264 with yuv420p needs even frame sizes
+            subprocess.run([ffmpeg, '-y', '-loglevel', 'error', '-framerate', str(fps), '-i', pattern,
+                            '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-c:v', 'libx264',
+                            '-pix_fmt', 'yuv420p', path], check=True)
+        else:
+            with Image.open(pattern % 0) as first:
+                images = _load_frames(pattern, range(1, written))
+                first.save(path, save_all=True, append_images=images,
+                           duration=1000 / fps, loop=0, optimize=False)
+    return written
+
+
+def add_export_arguments(parser):
+    """Adds the --export, --frames, --dpi, --fps and --workers options of the animation scripts."""
+    parser.add_argument('--export', metavar='PATH',
+                        help="render headless to this .mp4 or .gif file instead of showing a window")
+    parser.add_argument('--frames', type=parse_frames, metavar='START:STOP[:STEP]',
+                        help="steps to export, in Python slice syntax (default: all)")
+    parser.add_argument('--dpi', type=int, default=100, help="resolution of the exported frames")
+    parser.add_argument('--fps', type=float, default=1, help="frames per second of the export")
+    parser.add_argument('--workers', type=int, help="processes rendering frames (default: one per core)")
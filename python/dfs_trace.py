@@ -0,0 +1,328 @@
+import json
+import os
+import time
+from array import array
+
+import numpy as np
+
+from csr_graph import CSRGraph, _has_labels, _Labels, _write_labels
+from dfs_animation import CURRENT, FINISHED, ON_STACK, UNVISITED
+from scc import DISCOVER, FINISH, START, _dfs_events, _rows, _tarjan_events
+
+# Event kinds as stored on disk. In a DFS a discover is always a push of the
+# node onto the stack and a finish always its pop, so one event covers both.
+EVENT_KINDS = (START, DISCOVER, FINISH)
+_KIND_CODES = {kind: code for code, kind in enumerate(EVENT_KINDS)}
+_START, _DISCOVER, _FINISH = range(3)
+
+# Columns of the event log: (file name, dtype, array typecode)
+_COLUMNS = (('kinds', np.uint8, 'B'), ('node_ids', np.int64, 'q'), ('parent_ids', np.int64, 'q'),
+            ('pass_numbers', np.uint8, 'B'), ('scc', np.int64, 'q'))
+
+
+def _kosaraju_events(csr, passes):
+    """Yields (pass, kind, node, parent, scc) for the requested passes of Kosaraju's algorithm."""
+    n = csr.num_nodes
+    order = []
+    for kind, node, parent in _dfs_events(*_rows(csr), range(n), bytearray(n)):
+        if kind == FINISH:
+            order.append(node)
+        if 1 in passes:
+            yield 1, kind, node, parent, -1
+    if 2 not in passes:
+        return
+    scc = 0
+    for kind, node, parent in _dfs_events(*_rows(csr.transpose()), reversed(order), bytearray(n)):
+        if kind == START:
+            scc += 1
+        yield 2, kind, node, parent, scc
+
+
+def _tarjan_trace_events(csr):
+    """Yields (pass, kind, node, parent, scc) for Tarjan's algorithm, scc counting closed components."""
+    scc = 0
+    for kind, node, parent, component in _tarjan_events(*_rows(csr), csr.num_nodes):
+        if component is not None:
+            scc += 1
+        yield 1, kind, node, parent, scc
+
+
+class _Column:
+    """Buffered writer of one event column to a raw binary file."""
+
+    def __init__(self, path, typecode, flush_every):
+        self.file = open(path, 'wb')
+        self.buffer = array(typecode)
+        self.flush_every = flush_every
+
+    def append(self, value):
+        self.buffer.append(value)
+        if len(self.buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        self.buffer.tofile(self.file)
+        del self.buffer[:]
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+def record_trace(graph, path, algorithm='kosaraju', passes=(1, 2), checkpoint_interval=None,
+                 num_nodes=None, buffer_events=1 << 16):
+    """
+    Runs a traced SCC algorithm and streams its DFS events to a trace directory.
+
+    The directory holds one raw binary file per event column (kind, node,
+    parent, pass, component count), a checkpoint file with the full node
+    state array before every checkpoint_interval-th event, the node-label
+    table of CSRGraph.save when the nodes are not 0..n-1, and meta.json.
+    Memory stays at the node count plus buffer_events events however long the
+    trace is, and EventTrace can open the result without loading it.
+
+    Parameters:
+      graph: A NetworkX DiGraph, a CSRGraph or edge arrays (see CSRGraph.from_graph).
+      path (str): Directory to write; created if missing.
+      algorithm (str): 'kosaraju' or 'tarjan'.
+      passes (tuple): Kosaraju passes to record.
+      checkpoint_interval (int, optional): Events between checkpoints. Defaults to the
+        node count (at least 4096), so checkpoints take about as much space as the events.
+      num_nodes (int, optional): Number of nodes for edge arrays.
+      buffer_events (int): Events buffered in memory before a write.
+
+    Returns:
+      EventTrace: The recorded trace, opened from disk.
+    """
+    csr = CSRGraph.from_graph(graph, num_nodes)
+    n = csr.num_nodes
+    if algorithm == 'kosaraju':
+        events = _kosaraju_events(csr, passes)
+    elif algorithm == 'tarjan':
+        events = _tarjan_trace_events(csr)
+    else:
+        raise ValueError(f"Unknown algorithm {algorithm!r}, expected 'kosaraju' or 'tarjan'")
+    interval = checkpoint_interval or max(n, 4096)
+
+    os.makedirs(path, exist_ok=True)
+    columns = [_Column(os.path.join(path, f'{name}.bin'), typecode, buffer_events)
+               for name, _, typecode in _COLUMNS]
+    kinds, nodes, parents, pass_numbers, sccs = columns
+    state = bytearray(n)
+    count = 0
+    pass_starts = []
+    current = -1
+    current_pass = None
+    try:
+        with open(os.path.join(path, 'checkpoints.bin'), 'wb') as checkpoints:
+            for pass_number, kind, node, parent, scc in events:
+                if pass_number != current_pass:
+                    current_pass = pass_number
+                    pass_starts.append(count)
+                    state[:] = bytes(n)
+                    current = -1
+                if count % interval == 0:
+                    checkpoints.write(state)
+                kinds.append(_KIND_CODES[kind])
+                nodes.append(node)
+                parents.append(parent)
+                pass_numbers.append(pass_number)
+                sccs.append(scc)
+                count += 1
+
+                # Keep the node states in step for the checkpoints
+                if current >= 0 and current != node:
+                    state[current] = ON_STACK
+                if kind == FINISH:
+                    state[node] = FINISHED
+                    current = -1
+                else:
+                    state[node] = CURRENT
+                    current = node
+    finally:
+        for column in columns:
+            column.close()
+
+    # Labels go to the same sidecar table as CSRGraph.save, so meta.json stays small
+    has_labels = _has_labels(csr.nodes, n)
+    if has_labels:
+        _write_labels(path, csr.nodes)
+    meta = {'num_nodes': n, 'num_events': count, 'checkpoint_interval': interval,
+            'algorithm': algorithm, 'pass_starts': pass_starts, 'labels': has_labels}
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+    return EventTrace(path)
+
+
+class _Titles:
+    """Read-only sequence of step titles, generated when an index is read."""
+
+    def __init__(self, trace):
+        self.trace = trace
+
+    def __len__(self):
+        return len(self.trace)
+
+    def __getitem__(self, k):
+        return self.trace.describe(k)
+
+
+class EventTrace:
+    """
+    A DFS trace recorded by record_trace, opened lazily with np.memmap.
+
+    It offers the same changes/states_at/titles interface as DiffTrace, so
+    TraceRenderer and export_animation can show any frame of traces that do
+    not fit in memory. states_at seeks to the nearest checkpoint and replays
+    at most checkpoint_interval events with NumPy.
+    """
+
+    def __init__(self, path):
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        self.path = path
+        self.num_nodes = meta['num_nodes']
+        self.interval = meta['checkpoint_interval']
+        self.algorithm = meta['algorithm']
+        self.pass_starts = np.array(meta['pass_starts'], dtype=np.int64)
+        self.nodes = _Labels(path, self.num_nodes) if meta['labels'] else range(self.num_nodes)
+        num_events = meta['num_events']
+        for name, dtype, _ in _COLUMNS:
+            setattr(self, name, self._open(f'{name}.bin', dtype, (num_events,)))
+        num_checkpoints = -(-num_events // self.interval)
+        self.checkpoints = self._open('checkpoints.bin', np.uint8, (num_checkpoints, self.num_nodes))
+        self.titles = _Titles(self)
+
+    def _open(self, name, dtype, shape):
+        if 0 in shape:
+            # np.memmap cannot map empty files
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(os.path.join(self.path, name), dtype=dtype, mode='r', shape=shape)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    @property
+    def nbytes(self):
+        """Size of the trace on disk."""
+        return sum(os.path.getsize(os.path.join(self.path, name))
+                   for name in os.listdir(self.path))
+
+    def _pass_start(self, k):
+        return int(self.pass_starts[np.searchsorted(self.pass_starts, k, side='right') - 1])
+
+    def _events_changes(self, start, stop, pass_start):
+        """
+        The state changes of events start..stop-1 of one pass, in order, as (node ids, states).
+
+        Every event first puts the previous current node back on the stack,
+        when the previous event of the pass discovered it, and then sets its
+        own node to CURRENT or FINISHED.
+        """
+        kinds = np.asarray(self.kinds[start:stop])
+        ids = np.asarray(self.node_ids[start:stop])
+        first = max(start - 1, pass_start)
+        prev_kinds = np.asarray(self.kinds[first:stop - 1])
+        prev_ids = np.asarray(self.node_ids[first:stop - 1])
+        if start == pass_start:
+            # Nothing is current before the first event of a pass
+            prev_kinds = np.concatenate([[_FINISH], prev_kinds]).astype(np.uint8)
+            prev_ids = np.concatenate([[-1], prev_ids])
+
+        change_nodes = np.empty(2 * len(ids), dtype=np.int64)
+        change_states = np.empty(2 * len(ids), dtype=np.uint8)
+        change_nodes[0::2] = prev_ids
+        change_states[0::2] = ON_STACK
+        change_nodes[1::2] = ids
+        change_states[1::2] = np.where(kinds == _FINISH, FINISHED, CURRENT)
+        valid = np.ones(2 * len(ids), dtype=bool)
+        valid[0::2] = (prev_kinds != _FINISH) & (prev_ids != ids)
+        return change_nodes[valid], change_states[valid]
+
+    def changes(self, k):
+        """Returns (node ids, states) changed by step k; a new pass first resets every node."""
+        pass_start = self._pass_start(k)
+        ids, states = self._events_changes(k, k + 1, pass_start)
+        if k == pass_start and k > 0:
+            ids = np.concatenate([np.arange(self.num_nodes), ids])
+            states = np.concatenate([np.full(self.num_nodes, UNVISITED, dtype=np.uint8), states])
+        return ids, states
+
+    def states_at(self, k):
+        """
+        Rebuilds the state of every node after step k.
+
+        Starts from the last checkpoint at or before k (or from the start of
+        k's pass, if that is later) and replays the events since then.
+        """
+        pass_start = self._pass_start(k)
+        start = k // self.interval * self.interval
+        if start < pass_start:
+            start = pass_start
+            states = np.zeros(self.num_nodes, dtype=np.uint8)
+        else:
+            states = np.array(self.checkpoints[start // self.interval])
+        ids, values = self._events_changes(start, k + 1, pass_start)
+        if len(ids):
+            # The last change of every node wins
+            changed, last = np.unique(ids[::-1], return_index=True)
+            states[changed] = values[::-1][last]
+        return states
+
+    def describe(self, k):
+        """Returns the title of step k, built from its event."""
+        kind = int(self.kinds[k])
+        label = self.nodes[int(self.node_ids[k])]
+        parent = int(self.parent_ids[k])
+        scc = int(self.scc[k])
+        if kind == _START:
+            desc = f"Start DFS at node {label}."
+        elif kind == _DISCOVER:
+            desc = f"From {self.nodes[parent]}, explore to {label}."
+        elif parent >= 0:
+            desc = f"{label} finished. Backtrack to {self.nodes[parent]}."
+        else:
+            desc = f"{label} finished. DFS from {label} complete."
+        step = k - self._pass_start(k) + 1
+        if self.algorithm == 'tarjan':
+            return f"Step {step}: {desc} ({scc} SCCs closed)"
+        if self.pass_numbers[k] == 2:
+            return f"Step {step} (SCC{scc}): {desc}"
+        return f"Step {step}: {desc}"
+
+
+def benchmark_trace(num_nodes=1000000, average_degree=3, seed=0, path=None, seeks=20):
+    """
+    Records the Kosaraju trace of a random graph and times random frame seeks.
+
+    Parameters:
+      num_nodes (int): Number of nodes in the random graph.
+      average_degree (int): Edges per node.
+      seed (int): Seed for the graph and the seek positions.
+      path (str, optional): Trace directory. Defaults to a temporary one.
+      seeks (int): Number of random frames to rebuild.
+    """
+    import tempfile
+
+    rng = np.random.default_rng(seed)
+    m = num_nodes * average_degree
+    u = rng.integers(0, num_nodes, m)
+    v = rng.integers(0, num_nodes, m)
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = path or work_dir
+        start = time.perf_counter()
+        trace = record_trace((u, v), path, num_nodes=num_nodes)
+        print(f"Recorded {len(trace)} events for {num_nodes} nodes in {time.perf_counter() - start:.2f}s, "
+              f"{trace.nbytes / 2 ** 20:.1f} MB on disk")
+        frames = rng.integers(0, len(trace), seeks)
+        start = time.perf_counter()
+        for k in frames.tolist():
+            trace.states_at(k)
+            trace.titles[k]
+        print(f"Random frame rebuild: {(time.perf_counter() - start) / seeks * 1e3:.1f} ms per frame")
+        del trace
+
+
+# Example usage:
+if __name__ == '__main__':
+    benchmark_trace()
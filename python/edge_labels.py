@@ -0,0 +1,296 @@
+import time
+
+import numpy as np
+from matplotlib.artist import Artist
+from matplotlib.colors import to_rgba
+from matplotlib.path import Path
+from matplotlib.textpath import TextPath
+from matplotlib.transforms import Affine2D
+
+# Candidate pairs tested at once by find_crossings, to bound memory
+PAIR_BATCH = 1 << 22
+
+
+def edge_segments(G, pos, edges=None):
+    """
+    Collects the drawn edges as coordinate arrays.
+
+    Parameters:
+      G (NetworkX Graph): The graph.
+      pos (dict): Node positions.
+      edges (list, optional): Edges to use. Defaults to G.edges().
+
+    Returns:
+      tuple: (u, v, p, q) with the node indices of both ends (in G.nodes() order)
+        and their (m, 2) coordinates.
+    """
+    nodes = list(G.nodes())
+    index = {node: i for i, node in enumerate(nodes)}
+    xy = np.array([pos[node] for node in nodes], dtype=float).reshape(-1, 2)
+    edges = list(G.edges()) if edges is None else edges
+    u = np.fromiter((index[e[0]] for e in edges), dtype=np.int64, count=len(edges))
+    v = np.fromiter((index[e[1]] for e in edges), dtype=np.int64, count=len(edges))
+    return u, v, xy[u], xy[v]
+
+
+def shift_labels(p, q, shift=0.15):
+    """
+    Computes the label position of every edge at once.
+
+    Each label sits at the midpoint of its edge, moved perpendicular to the
+    edge (to the left of p -> q) by shift. Zero-length edges keep the midpoint.
+
+    Parameters:
+      p, q (array): (m, 2) end points of the edges.
+      shift (float or array): Offset per edge, in data units.
+
+    Returns:
+      numpy array: (m, 2) label positions.
+    """
+    mid = (p + q) / 2
+    d = q - p
+    length = np.hypot(d[:, 0], d[:, 1])
+    scale = np.divide(shift, length, out=np.zeros_like(length), where=length > 0)
+    # Perpendicular vector (-dy, dx), normalized and scaled
+    return mid + np.column_stack([-d[:, 1], d[:, 0]]) * scale[:, None]
+
+
+def _orientation(a, b, c):
+    """Sign of the turn a -> b -> c for arrays of points."""
+    return np.sign((b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0]))
+
+
+def _crossing(p, q, u, v, a, b):
+    """Which candidate pairs (a, b) cross properly, i.e. away from a shared end point."""
+    if u is not None:
+        shared = (u[a] == u[b]) | (u[a] == v[b]) | (v[a] == u[b]) | (v[a] == v[b])
+    else:
+        shared = ((p[a] == p[b]).all(1) | (p[a] == q[b]).all(1)
+                  | (q[a] == p[b]).all(1) | (q[a] == q[b]).all(1))
+    o1 = _orientation(p[a], q[a], p[b])
+    o2 = _orientation(p[a], q[a], q[b])
+    o3 = _orientation(p[b], q[b], p[a])
+    o4 = _orientation(p[b], q[b], q[a])
+    return ~shared & (o1 * o2 < 0) & (o3 * o4 < 0)
+
+
+def find_crossings(p, q, u=None, v=None, cell_size=None):
+    """
+    Finds all pairs of edges that cross, using a uniform spatial grid.
+
+    Every segment is entered in the grid cells its bounding box covers; only
+    segments that share a cell are tested, with vectorized orientation tests,
+    instead of all m^2 / 2 pairs. Edges that meet at a common node do not count
+    as crossing.
+
+    Parameters:
+      p, q (array): (m, 2) end points of the edges.
+      u, v (array, optional): Node indices of the ends, to recognize shared nodes exactly.
+      cell_size (float, optional): Grid spacing. Defaults to the mean bounding box side
+        of the segments, so a typical segment covers a few cells.
+
+    Returns:
+      tuple: Arrays (a, b) of edge indices with a < b, one entry per crossing pair.
+    """
+    m = len(p)
+    empty = np.zeros(0, dtype=np.int64)
+    if m < 2:
+        return empty, empty
+    lo = np.minimum(p, q)
+    hi = np.maximum(p, q)
+    if cell_size is None:
+        cell_size = float(np.mean((hi - lo).max(axis=1)))
+    if not cell_size > 0:
+        cell_size = 1.0
+    origin = lo.min(axis=0)
+    first = np.floor((lo - origin) / cell_size).astype(np.int64)
+    last = np.floor((hi - origin) / cell_size).astype(np.int64)
+    span = last - first + 1
+
+    # One (cell, segment) entry per covered cell
+    covered = span[:, 0] * span[:, 1]
+    segment = np.repeat(np.arange(m), covered)
+    local = np.arange(covered.sum()) - np.repeat(np.cumsum(covered) - covered, covered)
+    cx = first[segment, 0] + local % span[segment, 0]
+    cy = first[segment, 1] + local // span[segment, 0]
+    cell = cx * (int(last[:, 1].max()) + 1) + cy
+    order = np.argsort(cell, kind='stable')
+    cell = cell[order]
+    segment = segment[order]
+
+    # Every entry is paired with the entries after it in the same cell
+    entries = len(cell)
+    boundary = np.flatnonzero(np.diff(cell)) + 1
+    stops = np.append(boundary, entries)
+    sizes = np.diff(np.concatenate([[0], stops]))
+    counts = np.repeat(stops, sizes) - np.arange(entries) - 1
+    total = np.cumsum(counts)
+
+    found = []
+    start = 0
+    while start < entries:
+        done = total[start - 1] if start else 0
+        stop = max(int(np.searchsorted(total, done + PAIR_BATCH, side='right')), start + 1)
+        batch = counts[start:stop]
+        i = np.repeat(np.arange(start, stop), batch)
+        j = i + 1 + np.arange(batch.sum()) - np.repeat(np.cumsum(batch) - batch, batch)
+        a = segment[i]
+        b = segment[j]
+        a, b = np.minimum(a, b), np.maximum(a, b)
+        hit = _crossing(p, q, u, v, a, b)
+        found.append(a[hit] * m + b[hit])
+        start = stop
+
+    # A pair that shares several cells is found once per cell
+    pairs = np.unique(np.concatenate(found)) if found else empty
+    return pairs // m, pairs % m
+
+
+def place_edge_labels(p, q, u=None, v=None, shift=0.15):
+    """
+    Places every edge label, moving the labels of crossing edges off the crossing.
+
+    Labels of edges without crossings stay at the midpoint. Labels of edges
+    that cross another edge are shifted perpendicular by shift, like the
+    hand-picked crossing edges in 2a_drawing_graph.py.
+
+    Returns:
+      tuple: ((m, 2) label positions, (a, b) crossing pairs from find_crossings)
+    """
+    a, b = find_crossings(p, q, u, v)
+    crossing = np.zeros(len(p), dtype=bool)
+    crossing[a] = True
+    crossing[b] = True
+    return shift_labels(p, q, np.where(crossing, shift, 0.0)), (a, b)
+
+
+def _centered_text(text, fontsize):
+    path = TextPath((0, 0), text, size=fontsize)
+    extents = path.get_extents()
+    center = (extents.x0 + extents.x1) / 2, (extents.y0 + extents.y1) / 2
+    return Path(path.vertices - center, path.codes)
+
+
+def _label_box(glyphs, pad):
+    """Rectangle around centered glyph outlines, pad points wider on every side."""
+    extents = glyphs.get_extents()
+    x0, y0, x1, y1 = extents.x0 - pad, extents.y0 - pad, extents.x1 + pad, extents.y1 + pad
+    return Path([(x0, y0), (x1, y0), (x1, y1), (x0, y1), (x0, y0)], closed=True)
+
+
+class EdgeLabels(Artist):
+    """
+    A single artist that draws many short text labels.
+
+    Each distinct label string is converted to glyph outlines once, and all
+    positions that show it are drawn with one renderer.draw_markers call.
+    Agg rasterizes such a marker a single time and stamps it at every
+    position, which is far cheaper than one Text artist (or one collection
+    path) per label. The font size is in points at any zoom level or DPI.
+
+    With a background color every label sits on a filled box, like the white
+    bbox of nx.draw_networkx_edge_labels; the boxes are stamped the same way,
+    all before the glyphs, so no box hides another label's text.
+    """
+
+    # Above the edge and node collections, like matplotlib.text.Text
+    zorder = 3
+
+    def __init__(self, xy, labels, fontsize=10, color='red', background=None):
+        super().__init__()
+        xy = np.asarray(xy, dtype=float).reshape(-1, 2)
+        labels = np.asarray([str(label) for label in labels])
+        texts, group = np.unique(labels, return_inverse=True)
+        order = np.argsort(group, kind='stable')
+        bounds = np.searchsorted(group[order], np.arange(len(texts) + 1))
+        self.groups = [(_centered_text(text, fontsize), Path(xy[order[start:stop]]))
+                       for text, start, stop in zip(texts.tolist(), bounds[:-1], bounds[1:])]
+        self.color = to_rgba(color)
+        self.background = None if background is None else to_rgba(background)
+        # Same padding as the default bbox of nx.draw_networkx_edge_labels
+        self.boxes = [_label_box(glyphs, 0.3 * fontsize) for glyphs, _ in self.groups] if background else []
+
+    def draw(self, renderer):
+        if not self.get_visible():
+            return
+        gc = renderer.new_gc()
+        self._set_gc_clip(gc)
+        gc.set_linewidth(0)
+        gc.set_foreground(self.color, isRGBA=True)
+        gc.set_alpha(self.get_alpha())
+        # Glyph outlines are in points; the positions are in data coordinates
+        points = Affine2D().scale(renderer.points_to_pixels(1.0))
+        for box, (_, offsets) in zip(self.boxes, self.groups):
+            renderer.draw_markers(gc, box, points, offsets, self.get_transform(), self.background)
+        for glyphs, offsets in self.groups:
+            renderer.draw_markers(gc, glyphs, points, offsets, self.get_transform(), self.color)
+        gc.restore()
+        self.stale = False
+
+
+def draw_edge_labels(ax, xy, labels, fontsize=10, color='red', background=None):
+    """
+    Draws all labels as one batched EdgeLabels artist instead of one Text artist each.
+
+    Rendering cost grows with the number of distinct label strings, so
+    format float weights (e.g. rounded) before passing them in.
+
+    Parameters:
+      ax (matplotlib Axes): Axes to draw on.
+      xy (array): (m, 2) label positions in data coordinates.
+      labels (sequence): Label of every position; converted with str().
+      fontsize (float): Font size in points.
+      color: Text color.
+      background (optional): Fill color of a box behind every label, e.g. 'white'
+        to keep labels readable on top of edges. None draws the bare text.
+
+    Returns:
+      EdgeLabels: The added artist.
+    """
+    artist = EdgeLabels(xy, labels, fontsize, color, background)
+    artist.set_transform(ax.transData)
+    artist.set_clip_path(ax.patch)
+    ax.add_artist(artist)
+    return artist
+
+
+def benchmark_labels(num_nodes=20000, radius=0.006, seed=0):
+    """
+    Places and draws the weight labels of a random geometric graph and prints the timings.
+
+    Parameters:
+      num_nodes (int): Number of nodes; the radius sets how many edges they get.
+      radius (float): Connection radius in the unit square.
+      seed (int): Seed for the node positions and weights.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import networkx as nx
+    from matplotlib.collections import LineCollection
+
+    G = nx.random_geometric_graph(num_nodes, radius, seed=seed)
+    pos = nx.get_node_attributes(G, 'pos')
+    rng = np.random.default_rng(seed)
+    weights = rng.integers(1, 100, G.number_of_edges())
+
+    start = time.perf_counter()
+    u, v, p, q = edge_segments(G, pos)
+    xy, (a, b) = place_edge_labels(p, q, u, v, shift=radius / 4)
+    placed = time.perf_counter()
+
+    fig, ax = plt.subplots(figsize=(12, 12))
+    ax.add_collection(LineCollection(np.stack([p, q], axis=1), colors='black', linewidths=0.2))
+    draw_edge_labels(ax, xy, weights.tolist(), fontsize=2)
+    ax.autoscale()
+    ax.axis('off')
+    fig.canvas.draw()
+    drawn = time.perf_counter()
+    plt.close(fig)
+    print(f"{G.number_of_edges()} edges, {len(a)} crossing pairs: placement {placed - start:.3f}s, "
+          f"drawing {drawn - placed:.3f}s")
+
+
+# Example usage:
+if __name__ == '__main__':
+    benchmark_labels()
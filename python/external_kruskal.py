@@ -0,0 +1,170 @@
+import heapq
+import os
+import tempfile
+import time
+from itertools import islice
+
+import numpy as np
+
+from graph_creation import DisjointSet, edge_order, generate_weighted_edges, kruskal_edges
+
+
+def _run_dtype(weight_dtype):
+    # Sort key first: (weight, position in the input file)
+    return np.dtype([('w', weight_dtype), ('idx', np.int64), ('u', np.int64), ('v', np.int64)])
+
+
+def write_edge_list(path, u, v, weights):
+    """
+    Writes edge arrays as a text edge list with one "u v weight" line per edge.
+
+    This is the same format as networkx.write_weighted_edgelist.
+
+    Parameters:
+      path (str): File to write.
+      u, v (array): Endpoints of every edge.
+      weights (array): Weight of every edge.
+    """
+    weights = np.asarray(weights)
+    weight_format = '%d' if np.issubdtype(weights.dtype, np.integer) else '%.17g'
+    np.savetxt(path, np.column_stack([u, v, weights]),
+               fmt=['%d', '%d', weight_format], delimiter=' ')
+
+
+def _write_runs(path, run_dir, buffer_edges, weight_dtype):
+    """
+    Reads the edge list in chunks, sorts each chunk by weight and writes it as a binary run.
+
+    Returns:
+      tuple: (list of run file paths, largest node id seen)
+    """
+    dtype = _run_dtype(weight_dtype)
+    runs = []
+    max_node = -1
+    position = 0
+    with open(path) as f:
+        while True:
+            lines = list(islice(f, buffer_edges))
+            if not lines:
+                break
+            edges = np.loadtxt(lines, dtype=[('u', np.int64), ('v', np.int64), ('w', weight_dtype)],
+                               usecols=(0, 1, 2), ndmin=1)
+            if edges.size == 0:
+                continue
+            run = np.empty(edges.size, dtype=dtype)
+            run['u'] = edges['u']
+            run['v'] = edges['v']
+            run['w'] = edges['w']
+            run['idx'] = np.arange(position, position + edges.size)
+            position += edges.size
+            max_node = max(max_node, int(run['u'].max()), int(run['v'].max()))
+
+            run_path = os.path.join(run_dir, f'run_{len(runs):05d}.bin')
+            run[edge_order(run['w'])].tofile(run_path)
+            runs.append(run_path)
+    return runs, max_node
+
+
+def _read_run(run_path, dtype, block_edges):
+    """Yields (weight, idx, u, v) tuples from a sorted run, reading block_edges at a time."""
+    with open(run_path, 'rb') as f:
+        while True:
+            block = np.fromfile(f, dtype=dtype, count=block_edges)
+            if block.size == 0:
+                return
+            yield from zip(block['w'].tolist(), block['idx'].tolist(),
+                           block['u'].tolist(), block['v'].tolist())
+
+
+def external_kruskal(path, num_nodes=None, buffer_edges=1_000_000, weight_dtype=np.float64, tmp_dir=None):
+    """
+    Kruskal's algorithm over an on-disk edge list that does not need to fit in memory.
+
+    The file is read in chunks of buffer_edges lines; each chunk is sorted and
+    written to a temporary run. The runs are then combined with a k-way merge
+    that feeds the array-backed union-find, and the merge stops as soon as
+    num_nodes - 1 edges are accepted. Memory is bounded by the node count plus
+    buffer_edges edges.
+
+    Node ids must be the integers 0..num_nodes-1. Ties are broken by the
+    position in the file and edges keep their orientation in the file, so the
+    result equals kruskal_edges on the file's arrays (see check_external_kruskal).
+    kruskal_mst on a NetworkX graph breaks ties in adjacency order instead, so
+    with tied weights it can pick a different tree of the same total weight.
+
+    Parameters:
+      path (str): Text edge list with one "u v weight" line per edge.
+      num_nodes (int, optional): Number of nodes. Defaults to the largest id in the file plus one.
+      buffer_edges (int): Number of edges held in memory at once.
+      weight_dtype (numpy dtype): Type used to parse the weights.
+      tmp_dir (str, optional): Directory for the temporary runs.
+
+    Returns:
+      list: MST edges as (u, v, weight) tuples, in the order they were accepted.
+    """
+    dtype = _run_dtype(weight_dtype)
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as run_dir:
+        runs, max_node = _write_runs(path, run_dir, buffer_edges, weight_dtype)
+        if num_nodes is None:
+            num_nodes = max_node + 1
+
+        # Split the buffer between the runs during the merge
+        block_edges = max(1, buffer_edges // max(1, len(runs)))
+        readers = [_read_run(run_path, dtype, block_edges) for run_path in runs]
+        ds = DisjointSet(num_nodes)
+        mst = []
+        try:
+            for w, _, a, b in heapq.merge(*readers):
+                if ds.union(a, b):
+                    mst.append((a, b, w))
+                    if len(mst) >= num_nodes - 1:
+                        break
+        finally:
+            # Close the run files before the temporary directory is removed
+            for reader in readers:
+                reader.close()
+    return mst
+
+
+def check_external_kruskal(num_nodes=20000, edge_probability=5e-4, seed=0, buffer_edges=10000):
+    """
+    Checks that external_kruskal returns the edges kruskal_edges picks on the same arrays.
+
+    The random graph has weights 1..3, so nearly every edge ties with others and
+    is split over many runs, and a tiny file pins down the tie order.
+
+    Parameters:
+      num_nodes (int): Number of nodes in the random graph.
+      edge_probability (float): Probability of each edge.
+      seed (int): Seed for the graph.
+      buffer_edges (int): Edges per run.
+    """
+    tied = (np.array([0, 2, 0, 1]), np.array([1, 3, 2, 3]), np.array([1, 1, 1, 1]))
+    random_graph = generate_weighted_edges(num_nodes, edge_probability, 1, 3, seed=seed)
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = os.path.join(work_dir, 'edges.txt')
+        for u, v, weights in (tied, random_graph):
+            write_edge_list(path, u, v, weights)
+            mst = external_kruskal(path, buffer_edges=buffer_edges, weight_dtype=np.int64)
+            u, v, weights = np.loadtxt(path, dtype=np.int64, ndmin=2).T
+            reference = kruskal_edges(int(max(u.max(), v.max())) + 1, u, v, weights)
+            expected = list(zip(u[reference].tolist(), v[reference].tolist(), weights[reference].tolist()))
+            if mst != expected:
+                raise RuntimeError(f"external_kruskal differs from kruskal_edges: {mst[:5]} vs {expected[:5]}")
+    print("external_kruskal matches kruskal_edges on the file's arrays")
+
+
+# Example usage:
+if __name__ == '__main__':
+    num_nodes = 100000
+    u, v, weights = generate_weighted_edges(num_nodes, 1e-4, 1, 10, seed=0)
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = os.path.join(work_dir, 'edges.txt')
+        write_edge_list(path, u, v, weights)
+
+        start = time.perf_counter()
+        mst = external_kruskal(path, num_nodes, buffer_edges=100000, weight_dtype=np.int64)
+        print(f"External Kruskal: {len(mst)} MST edges from {len(u)} edges "
+              f"in {time.perf_counter() - start:.2f}s")
+
+    check_external_kruskal()
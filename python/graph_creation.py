@@ -1,113 +1,465 @@
 import networkx as nx
 import matplotlib.pyplot as plt
+import numpy as np
 import random
 
+from csr_graph import CSRGraph
+from force_layout import cached_layout
+from graph_render import MAX_LABELS, draw_graph, draw_mst_overlay
 
-def generate_weighted_graph(num_nodes, edge_probability, min_weight, max_weight):
+
+def generate_weighted_edges(num_nodes, edge_probability, min_weight, max_weight, seed=None):
     """
-    Generates a random weighted graph.
+    Generates the edges of a random weighted graph as NumPy arrays.
+
+    Instead of testing every pair, the number of pairs skipped before the next
+    edge is drawn from a geometric distribution, so the cost grows with the
+    number of edges produced rather than with num_nodes^2.
 
     Parameters:
       num_nodes (int): Number of nodes in the graph.
       edge_probability (float): Probability that an edge exists between any two nodes.
       min_weight (int): Minimum edge weight.
       max_weight (int): Maximum edge weight.
+      seed (int or numpy Generator, optional): Seed for the random generator.
 
     Returns:
-      NetworkX Graph: The generated weighted graph.
+      tuple: Arrays (u, v, weights) with u < v for every edge.
+    """
+    rng = np.random.default_rng(seed)
+    num_pairs = num_nodes * (num_nodes - 1) // 2
+    if num_pairs == 0 or edge_probability <= 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty.copy(), empty.copy()
+    p = min(edge_probability, 1.0)
+
+    # Draw gaps in batches until we have walked past the last pair.
+    # Pairs are numbered row by row: (0, 1), (0, 2), ..., (1, 2), ...
+    chunks = []
+    last = -1
+    while last < num_pairs - 1:
+        expected = (num_pairs - 1 - last) * p
+        batch = int(expected + 4 * np.sqrt(expected) + 16)
+        positions = last + np.cumsum(rng.geometric(p, size=batch))
+        positions = positions[positions < num_pairs]
+        if positions.size:
+            chunks.append(positions)
+            last = positions[-1]
+        if positions.size < batch:
+            break
+    pair_index = np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64)
+
+    # Map each pair index back to (row, column) with the row start offsets.
+    rows = np.arange(num_nodes, dtype=np.int64)
+    row_start = rows * (2 * num_nodes - rows - 1) // 2
+    u = np.searchsorted(row_start, pair_index, side='right') - 1
+    v = pair_index - row_start[u] + u + 1
+    weights = rng.integers(min_weight, max_weight + 1, size=pair_index.size)
+    return u, v, weights
+
+
+def edges_to_graph(num_nodes, u, v, weights):
+    """
+    Builds a NetworkX graph from edge arrays.
+
+    Parameters:
+      num_nodes (int): Number of nodes in the graph.
+      u, v (array): Endpoints of every edge.
+      weights (array): Weight of every edge.
+
+    Returns:
+      NetworkX Graph: The weighted graph.
     """
     G = nx.Graph()
     G.add_nodes_from(range(num_nodes))
-    for i in range(num_nodes):
-        for j in range(i + 1, num_nodes):
-            if random.random() < edge_probability:
-                weight = random.randint(min_weight, max_weight)
-                G.add_edge(i, j, weight=weight)
+    G.add_weighted_edges_from(zip(np.asarray(u).tolist(),
+                                  np.asarray(v).tolist(),
+                                  np.asarray(weights).tolist()))
     return G
 
 
-def kruskal_mst(G):
+class COOGraph:
     """
-    Computes the Minimum Spanning Tree (MST) of a graph using Kruskal's algorithm.
+    Undirected weighted graph stored as coordinate (COO) arrays: edge k joins u[k] and v[k].
+
+    Node ids are 0..num_nodes-1, stored as int32 when they fit, and weights
+    keep whatever compact dtype they were given, so an edge costs about 10
+    bytes instead of the several hundred of an edge in nx.Graph.
+    """
+
+    def __init__(self, num_nodes, u, v, weights):
+        self.num_nodes = num_nodes
+        self.u = u
+        self.v = v
+        self.weights = weights
+
+    @classmethod
+    def from_edges(cls, num_nodes, u, v, weights):
+        """Builds the graph from edge arrays, narrowing the ids and integer weights to compact dtypes."""
+        id_dtype = np.int32 if num_nodes <= np.iinfo(np.int32).max else np.int64
+        weights = np.asarray(weights)
+        if weights.size and np.issubdtype(weights.dtype, np.integer):
+            # Smallest integer type that holds every weight, e.g. uint8 for 1..10
+            weights = weights.astype(np.result_type(np.min_scalar_type(int(weights.min())),
+                                                    np.min_scalar_type(int(weights.max()))))
+        return cls(num_nodes, np.asarray(u, dtype=id_dtype), np.asarray(v, dtype=id_dtype), weights)
+
+    def number_of_nodes(self):
+        return self.num_nodes
+
+    def number_of_edges(self):
+        return len(self.u)
+
+    @property
+    def nbytes(self):
+        """Memory held by the edge arrays."""
+        return self.u.nbytes + self.v.nbytes + self.weights.nbytes
+
+    def to_networkx(self):
+        """Converts to a NetworkX Graph with 'weight' attributes, e.g. for drawing."""
+        return edges_to_graph(self.num_nodes, self.u, self.v, self.weights)
+
+    def to_csr(self):
+        """Converts to an undirected CSRGraph, e.g. to save it with CSRGraph.save."""
+        return CSRGraph.from_edges(self.u, self.v, self.num_nodes, self.weights, directed=False)
+
+    def to_scipy(self):
+        """Returns the weights as an upper-triangular scipy.sparse.coo_matrix (requires SciPy)."""
+        from scipy.sparse import coo_matrix
+        return coo_matrix((self.weights, (self.u, self.v)), shape=(self.num_nodes, self.num_nodes))
+
+
+def generate_weighted_graph(num_nodes, edge_probability, min_weight, max_weight, seed=None, method='pairs',
+                            path=None, backend='networkx'):
+    """
+    Generates a random weighted graph.
 
     Parameters:
-      G (NetworkX Graph): A weighted graph.
+      num_nodes (int): Number of nodes in the graph.
+      edge_probability (float): Probability that an edge exists between any two nodes.
+      min_weight (int): Minimum edge weight.
+      max_weight (int): Maximum edge weight.
+      seed (int, optional): Seed for the random generator.
+      method (str): 'pairs' tests every pair of nodes, 'skip' uses
+        generate_weighted_edges and only pays for the edges it creates.
+      path (str, optional): Also save the graph there in the binary CSR file
+        format, so it can be reopened with CSRGraph.load.
+      backend (str): 'networkx' returns an nx.Graph, 'coo' a COOGraph that keeps
+        the edges in compact arrays and never builds a NetworkX graph.
 
     Returns:
-      NetworkX Graph: A graph representing the MST.
-    """
-    # Initialize union-find structure
-    parent = {node: node for node in G.nodes()}
-    rank = {node: 0 for node in G.nodes()}
-
-    def find(u):
-        # Path compression
-        if parent[u] != u:
-            parent[u] = find(parent[u])
-        return parent[u]
-
-    def union(u, v):
-        ru = find(u)
-        rv = find(v)
-        if ru == rv:
+      NetworkX Graph or COOGraph: The generated weighted graph.
+    """
+    if backend not in ('networkx', 'coo'):
+        raise ValueError(f"Unknown backend: {backend!r}")
+    if method == 'skip':
+        u, v, weights = generate_weighted_edges(num_nodes, edge_probability, min_weight, max_weight, seed)
+    elif method == 'pairs':
+        if seed is not None:
+            random.seed(seed)
+        edges = []
+        for i in range(num_nodes):
+            for j in range(i + 1, num_nodes):
+                if random.random() < edge_probability:
+                    weight = random.randint(min_weight, max_weight)
+                    edges.append((i, j, weight))
+        u, v, weights = np.array(edges, dtype=np.int64).reshape(-1, 3).T
+    else:
+        raise ValueError(f"Unknown method: {method!r}")
+
+    if path is not None:
+        CSRGraph.from_edges(u, v, num_nodes, weights, directed=False).save(path)
+    if backend == 'coo':
+        return COOGraph.from_edges(num_nodes, u, v, weights)
+    return edges_to_graph(num_nodes, u, v, weights)
+
+
+def write_weighted_graph(path, num_nodes, edge_probability, min_weight, max_weight, seed=None):
+    """
+    Generates a random weighted graph straight into the binary CSR file format.
+
+    Unlike generate_weighted_graph(..., path=path) no NetworkX graph is
+    built, so this scales to graphs far larger than the dict-of-dicts would allow.
+
+    Parameters:
+      path (str): Directory to write (see CSRGraph.save).
+      num_nodes, edge_probability, min_weight, max_weight, seed: As for generate_weighted_edges.
+
+    Returns:
+      CSRGraph: The saved graph, opened from disk.
+    """
+    u, v, weights = generate_weighted_edges(num_nodes, edge_probability, min_weight, max_weight, seed)
+    CSRGraph.from_edges(u, v, num_nodes, weights, directed=False).save(path)
+    return CSRGraph.load(path)
+
+
+class DisjointSet:
+    """
+    Union-find over the integers 0..n-1 stored in flat NumPy arrays.
+
+    find is iterative, so long parent chains cannot hit the recursion limit,
+    and compress flattens every chain at once with vectorized pointer jumping.
+    """
+
+    def __init__(self, n):
+        self.parent = np.arange(n, dtype=np.int64)
+        self.rank = np.zeros(n, dtype=np.int8)
+
+    def find(self, x):
+        parent = self.parent
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        # Path compression: point every node on the path directly at the root
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def union(self, x, y):
+        rx = self.find(x)
+        ry = self.find(y)
+        if rx == ry:
             return False
-        if rank[ru] < rank[rv]:
-            parent[ru] = rv
-        elif rank[ru] > rank[rv]:
-            parent[rv] = ru
-        else:
-            parent[rv] = ru
-            rank[ru] += 1
+        if self.rank[rx] < self.rank[ry]:
+            rx, ry = ry, rx
+        self.parent[ry] = rx
+        if self.rank[rx] == self.rank[ry]:
+            self.rank[rx] += 1
         return True
 
-    # Get all edges and sort them by weight
-    edges = list(G.edges(data=True))
-    edges.sort(key=lambda edge: edge[2]['weight'])
+    def compress(self):
+        """Points every node directly at its root."""
+        parent = self.parent
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent[:] = grandparent
+        return parent
 
-    # Create MST graph and add nodes
-    T = nx.Graph()
-    T.add_nodes_from(G.nodes())
 
-    # Iterate over sorted edges and add them if they don't form a cycle
-    for u, v, data in edges:
-        if union(u, v):
-            T.add_edge(u, v, weight=data['weight'])
+def graph_to_edge_arrays(G, weight='weight'):
+    """
+    Converts a NetworkX graph to integer edge arrays.
 
+    Parameters:
+      G (NetworkX Graph): A weighted graph.
+      weight (str): Name of the edge attribute holding the weight.
+
+    Returns:
+      tuple: (nodes, u, v, weights) where u and v index into the nodes list.
+    """
+    nodes = list(G.nodes())
+    index = {node: i for i, node in enumerate(nodes)}
+    edges = list(G.edges(data=weight))
+    u = np.fromiter((index[a] for a, _, _ in edges), dtype=np.int64, count=len(edges))
+    v = np.fromiter((index[b] for _, b, _ in edges), dtype=np.int64, count=len(edges))
+    weights = np.array([w for _, _, w in edges])
+    return nodes, u, v, weights
+
+
+# Integer weights spanning at most this many distinct values are ordered with a
+# counting (radix) sort instead of a comparison sort.
+COUNTING_SORT_MAX_RANGE = 1 << 16
+
+
+def edge_order(weights):
+    """
+    Returns the stable ascending order of the edge weights.
+
+    When the weights are integers in a small range (such as the default 1..10
+    of generate_weighted_graph) they are shifted into 8- or 16-bit keys, which
+    NumPy orders with a linear-time radix sort. Anything else falls back to a
+    stable comparison sort.
+
+    Parameters:
+      weights (array): Weight of every edge.
+
+    Returns:
+      numpy array: Edge indices sorted by weight, ties kept in input order.
+    """
+    weights = np.asarray(weights)
+    if weights.size and np.issubdtype(weights.dtype, np.integer):
+        low = int(weights.min())
+        span = int(weights.max()) - low + 1
+        if span <= COUNTING_SORT_MAX_RANGE:
+            key_type = np.uint8 if span <= 1 << 8 else np.uint16
+            return np.argsort((weights - low).astype(key_type), kind='stable')
+    return np.argsort(weights, kind='stable')
+
+
+def kruskal_edges(num_nodes, u, v, weights):
+    """
+    Kruskal's algorithm over edge arrays with integer node ids 0..num_nodes-1.
+
+    Edges are ordered with edge_order, so ties keep their input order and small
+    integer weight ranges are sorted in linear time. The sorted edges are
+    processed in chunks: at the start of each chunk the union-find is flattened
+    and every edge whose endpoints already share a root is discarded with one
+    vectorized comparison, so only the few remaining candidates go through the
+    Python loop. Processing stops as soon as num_nodes - 1 edges are accepted.
+
+    Parameters:
+      num_nodes (int): Number of nodes.
+      u, v (array): Endpoints of every edge.
+      weights (array): Weight of every edge.
+
+    Returns:
+      numpy array: Indices of the MST edges, in the order they were accepted.
+    """
+    u = np.asarray(u)
+    v = np.asarray(v)
+    order = edge_order(weights)
+    sorted_u = u[order]
+    sorted_v = v[order]
+
+    ds = DisjointSet(num_nodes)
+    selected = []
+    needed = num_nodes - 1
+    chunk = max(num_nodes, 4096)
+    for start in range(0, len(order), chunk):
+        if len(selected) >= needed:
+            break
+        parent = ds.compress()
+        cu = sorted_u[start:start + chunk]
+        cv = sorted_v[start:start + chunk]
+        candidates = np.flatnonzero(parent[cu] != parent[cv])
+        for k, a, b in zip(candidates.tolist(), cu[candidates].tolist(), cv[candidates].tolist()):
+            if ds.union(a, b):
+                selected.append(start + k)
+                if len(selected) >= needed:
+                    break
+
+    return order[np.array(selected, dtype=np.int64)]
+
+
+def kruskal_csr(graph):
+    """
+    Kruskal's algorithm on a weighted CSRGraph or a saved one, without a NetworkX graph.
+
+    A saved graph is opened with CSRGraph.load, so the targets and weights are
+    read straight from the mapped files.
+
+    Parameters:
+      graph (CSRGraph or str): The graph, or the directory it was saved to.
+
+    Returns:
+      tuple: Arrays (u, v, weights) of the MST edges, in the order they were accepted;
+        u and v are int64 whatever the stored id type.
+    """
+    csr = CSRGraph.from_graph(graph, symmetrize=False)
+    u, v, weights = csr.edge_arrays()
+    mst = kruskal_edges(csr.num_nodes, u, v, weights)
+    return np.asarray(u[mst], dtype=np.int64), np.asarray(v[mst], dtype=np.int64), np.asarray(weights[mst])
+
+
+def kruskal_mst(G):
+    """
+    Computes the Minimum Spanning Tree (MST) of a graph using Kruskal's algorithm.
+
+    Parameters:
+      G (NetworkX Graph or COOGraph): A weighted graph.
+
+    Returns:
+      NetworkX Graph or COOGraph: A graph representing the MST, of the same kind as G.
+    """
+    if isinstance(G, COOGraph):
+        # Stays in compact arrays from end to end
+        mst = kruskal_edges(G.num_nodes, G.u, G.v, G.weights)
+        return COOGraph(G.num_nodes, G.u[mst], G.v[mst], G.weights[mst])
+
+    nodes, u, v, weights = graph_to_edge_arrays(G)
+    mst = kruskal_edges(len(nodes), u, v, weights)
+
+    T = nx.Graph()
+    T.add_nodes_from(G.nodes())
+    T.add_weighted_edges_from(zip([nodes[i] for i in u[mst].tolist()],
+                                  [nodes[i] for i in v[mst].tolist()],
+                                  weights[mst].tolist()))
     return T
 
 
-def draw_graphs_side_by_side(G, T):
+def draw_graphs_side_by_side(G, T, pos=None, seed=0, cache_dir=None, node_size=None):
     """
     Draws the original graph and its MST side by side.
 
+    The right panel shows the MST edges on top of the faded graph edges.
+
+    COOGraph arguments are converted to NetworkX graphs here, for the layout
+    and the drawing; everything before this point can stay in arrays.
+
     Parameters:
-      G (NetworkX Graph): The original weighted graph.
-      T (NetworkX Graph): The minimum spanning tree of G.
+      G (NetworkX Graph or COOGraph): The original weighted graph.
+      T (NetworkX Graph or COOGraph): The minimum spanning tree of G.
+      pos (dict, optional): Node positions. Defaults to the seeded force layout of G.
+      seed (int): Seed of the layout.
+      cache_dir (str, optional): Directory to cache the layout in, e.g.
+        force_layout.LAYOUT_CACHE_DIR (see force_layout.cached_layout). Nothing is
+        written to disk unless it is given.
+      node_size (float, optional): Marker area of the nodes. Defaults to 500, smaller for
+        graphs too large for labels.
     """
-    # Compute a layout that will be shared by both graphs
-    pos = nx.spring_layout(G)
+    if isinstance(G, COOGraph):
+        G = G.to_networkx()
+    if isinstance(T, COOGraph):
+        T = T.to_networkx()
+
+    # Compute a layout that will be shared by both graphs; with a cache_dir,
+    # repeated runs on the same graph reuse it and small edits only refine it
+    if pos is None:
+        pos = cached_layout(G, cache_dir, seed=seed)
+    if node_size is None and G.number_of_nodes() <= MAX_LABELS:
+        node_size = 500
 
     # Create side-by-side subplots
     fig, axes = plt.subplots(1, 2, figsize=(12, 6))
 
-    # Draw original graph
+    # Draw original graph; nodes, edges and labels are one collection each and
+    # the edges turn into a density image for very large graphs
     ax = axes[0]
-    nx.draw(G, pos, with_labels=True, node_color='lightblue', node_size=500, ax=ax)
-    edge_labels = nx.get_edge_attributes(G, 'weight')
-    nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels, ax=ax)
+    draw_graph(ax, G, pos, node_color='lightblue', node_size=node_size, edge_labels='weight',
+               label_color='black')
     ax.set_title("Original Graph")
+    ax.axis('off')
 
-    # Draw MST
+    # Draw MST as a second collection over the graph, on the same positions
     ax = axes[1]
-    nx.draw(T, pos, with_labels=True, node_color='lightgreen', node_size=500, ax=ax)
-    mst_edge_labels = nx.get_edge_attributes(T, 'weight')
-    nx.draw_networkx_edge_labels(T, pos, edge_labels=mst_edge_labels, ax=ax)
+    draw_mst_overlay(ax, G, T, pos, mst_labels='weight', node_color='lightgreen',
+                     node_size=node_size, label_color='black')
     ax.set_title("Minimum Spanning Tree (Kruskal)")
+    ax.axis('off')
 
     plt.tight_layout()
     plt.show()
 
 
+def benchmark_backends(num_nodes=5000, edge_probability=0.02, min_weight=1, max_weight=10, seed=0):
+    """
+    Generates a graph and its MST with both backends and prints the time,
+    the peak memory traced by tracemalloc and the bytes per edge.
+    """
+    import time
+    import tracemalloc
+
+    trees = {}
+    for backend in ('networkx', 'coo'):
+        tracemalloc.start()
+        start = time.perf_counter()
+        G = generate_weighted_graph(num_nodes, edge_probability, min_weight, max_weight, seed=seed,
+                                    method='skip', backend=backend)
+        T = kruskal_mst(G)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        m = G.number_of_edges()
+        trees[backend] = T
+        print(f"{backend:>8}: {m} edges, {elapsed:.2f}s, peak {peak / 2 ** 20:.1f} MB "
+              f"({peak / max(m, 1):.0f} bytes per edge)")
+        del G, T
+    if trees['coo'].weights.sum() != trees['networkx'].size(weight='weight'):
+        raise RuntimeError("The backends found MSTs of different weight")
+
+
 # Example usage:
 if __name__ == '__main__':
     num_nodes = 20  # Number of nodes in the graph
@@ -0,0 +1,381 @@
+import time
+
+import numpy as np
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.transforms import Affine2D
+
+from edge_labels import draw_edge_labels, edge_segments
+
+# Edge count above which draw_graph rasterizes the edges into a density image
+DENSITY_THRESHOLD = 50000
+
+# Node and edge labels are only drawn for graphs up to this size
+MAX_LABELS = 200
+
+# Line segments per curved edge
+CURVE_SEGMENTS = 16
+
+# Samples rasterized at once by draw_density, to bound memory
+SAMPLE_BATCH = 1 << 22
+
+
+def node_positions(G, pos):
+    """
+    Collects the node positions of G as one array.
+
+    Returns:
+      tuple: (nodes, xy) with the nodes in G.nodes() order and their (n, 2) coordinates.
+    """
+    nodes = list(G.nodes())
+    return nodes, np.array([pos[node] for node in nodes], dtype=float).reshape(-1, 2)
+
+
+def draw_nodes(ax, xy, labels=None, node_color='lightblue', node_size=300, edgecolors=None,
+               linewidths=1.0, font_size=12, font_color='black'):
+    """
+    Draws all nodes as one PathCollection and their labels as one EdgeLabels artist.
+
+    Parameters:
+      ax (matplotlib Axes): Axes to draw on.
+      xy (array): (n, 2) node positions.
+      labels (sequence, optional): Label of every node; none are drawn when omitted.
+      node_color: One color or one per node.
+      node_size (float): Marker area in points^2, as in nx.draw.
+      edgecolors: Marker border color.
+      linewidths (float): Marker border width.
+      font_size (float): Label size in points.
+      font_color: Label color.
+
+    Returns:
+      tuple: (node collection, label artist or None)
+    """
+    nodes = ax.scatter(xy[:, 0], xy[:, 1], s=node_size, c=node_color, edgecolors=edgecolors,
+                       linewidths=linewidths, zorder=2)
+    text = None
+    if labels is not None:
+        text = draw_edge_labels(ax, xy, labels, fontsize=font_size, color=font_color)
+        text.set_zorder(3)
+    return nodes, text
+
+
+def _display_lengths(ax, p, q):
+    """Lengths of the segments p -> q in points, with the current axis limits."""
+    ax.autoscale_view()
+    d = ax.transData.transform(q) - ax.transData.transform(p)
+    return np.hypot(d[:, 0], d[:, 1]) * 72 / ax.figure.dpi
+
+
+def draw_edges(ax, p, q, color='gray', width=1.0, alpha=None, curvature=0.0, arrows=False,
+               arrow_size=12, margin=0.0, zorder=1):
+    """
+    Draws all edges as one LineCollection, plus one PolyCollection of arrowheads.
+
+    Curved edges are quadratic Bezier curves with the control point placed
+    like matplotlib's 'arc3,rad=curvature' connection style, each flattened
+    into CURVE_SEGMENTS line segments. The margin trims both ends so arrows
+    stop at the node border; arrowheads are drawn in points, so they keep
+    their shape at any zoom level or aspect ratio.
+
+    Parameters:
+      ax (matplotlib Axes): Axes to draw on.
+      p, q (array): (m, 2) end points of the edges.
+      color: Edge color, one or one per edge.
+      width (float): Line width in points.
+      alpha (float, optional): Transparency.
+      curvature (float): Bend of the edges, relative to their length; 0 draws straight lines.
+      arrows (bool): Draw an arrowhead at every q.
+      arrow_size (float): Arrowhead length in points.
+      margin (float): Space left free at both ends, in points.
+      zorder (float): Drawing order.
+
+    Returns:
+      tuple: (edge collection, arrowhead collection or None)
+    """
+    p = np.asarray(p, dtype=float).reshape(-1, 2)
+    q = np.asarray(q, dtype=float).reshape(-1, 2)
+    lines = LineCollection(np.stack([p, q], axis=1), colors=color, linewidths=width, alpha=alpha,
+                           zorder=zorder)
+    ax.add_collection(lines)
+    if not len(p) or not (curvature or arrows or margin):
+        ax.autoscale_view()
+        return lines, None
+
+    # Parameter range left after trimming margin points off both ends
+    t_margin = np.zeros(len(p))
+    if margin:
+        t_margin = np.minimum(margin / np.maximum(_display_lengths(ax, p, q), 1e-12), 0.45)
+    d = q - p
+    control = (p + q) / 2 + curvature * np.column_stack([d[:, 1], -d[:, 0]])
+    t = t_margin[:, None] + (1 - 2 * t_margin)[:, None] * np.linspace(0, 1, CURVE_SEGMENTS + 1)[None, :]
+    s = 1 - t
+    curves = (s * s)[:, :, None] * p[:, None] + (2 * s * t)[:, :, None] * control[:, None] \
+        + (t * t)[:, :, None] * q[:, None]
+    lines.set_segments(curves)
+
+    heads = None
+    if arrows:
+        # Direction of the curve at the tip, taken in display space
+        tips = curves[:, -1]
+        tangent = ax.transData.transform(tips) - ax.transData.transform(curves[:, -2])
+        tangent /= np.maximum(np.hypot(tangent[:, 0], tangent[:, 1]), 1e-12)[:, None]
+        normal = np.column_stack([-tangent[:, 1], tangent[:, 0]])
+        back = -arrow_size * tangent
+        half = arrow_size * 0.3 * normal
+        verts = np.stack([np.zeros_like(back), back + half, back - half], axis=1)
+        heads = PolyCollection(verts, offsets=tips, offset_transform=ax.transData, facecolors=color,
+                               edgecolors='none', alpha=alpha, zorder=zorder)
+        heads.set_transform(Affine2D().scale(ax.figure.dpi / 72))
+        ax.add_collection(heads)
+    return lines, heads
+
+
+def draw_density(ax, p, q, resolution=None, cmap='Greys', zorder=1):
+    """
+    Rasterizes all edges into an image that counts the edges crossing every pixel.
+
+    Each edge is sampled about once per pixel it spans and the samples are
+    accumulated with np.bincount, so the cost grows with the number of edges
+    (times their length in pixels) and the drawing is a single image, however
+    many edges there are. Counts are shown on a log scale; empty pixels stay
+    transparent.
+
+    Parameters:
+      ax (matplotlib Axes): Axes to draw on.
+      p, q (array): (m, 2) end points of the edges.
+      resolution (tuple, optional): (width, height) of the image in pixels. Defaults
+        to the size of the axes on screen.
+      cmap: Colormap of the counts.
+      zorder (float): Drawing order.
+
+    Returns:
+      AxesImage: The density image.
+    """
+    p = np.asarray(p, dtype=float).reshape(-1, 2)
+    q = np.asarray(q, dtype=float).reshape(-1, 2)
+    if resolution is None:
+        box = ax.get_window_extent()
+        resolution = (max(int(box.width), 1), max(int(box.height), 1))
+    size = np.array(resolution, dtype=np.int64)
+    lo = np.minimum(p.min(axis=0), q.min(axis=0)) if len(p) else np.zeros(2)
+    hi = np.maximum(p.max(axis=0), q.max(axis=0)) if len(p) else np.ones(2)
+    scale = size / np.maximum(hi - lo, 1e-12)
+    a = (p - lo) * scale
+    b = (q - lo) * scale
+    samples = np.minimum(np.ceil(np.abs(b - a).max(axis=1)).astype(np.int64), size.max()) + 1
+    # Per edge: the first sample and the move from one sample to the next, in pixels
+    first = a.astype(np.float32)
+    increment = ((b - a) / np.maximum(samples - 1, 1)[:, None]).astype(np.float32)
+    total = np.cumsum(samples)
+
+    counts = np.zeros(int(size[0] * size[1]), dtype=np.int64)
+    start = 0
+    while start < len(samples):
+        done = total[start - 1] if start else 0
+        stop = max(int(np.searchsorted(total, done + SAMPLE_BATCH, side='right')), start + 1)
+        batch = samples[start:stop]
+        step = (np.arange(batch.sum()) - np.repeat(np.cumsum(batch) - batch, batch)).astype(np.float32)
+        # np.repeat of per-edge values is much cheaper than fancy indexing per sample
+        x = np.repeat(first[start:stop, 0], batch)
+        x += step * np.repeat(increment[start:stop, 0], batch)
+        y = np.repeat(first[start:stop, 1], batch)
+        y += step * np.repeat(increment[start:stop, 1], batch)
+        pixel = np.minimum(y.astype(np.int64), size[1] - 1) * size[0]
+        pixel += np.minimum(x.astype(np.int64), size[0] - 1)
+        counts += np.bincount(pixel, minlength=len(counts))
+        start = stop
+
+    image = np.log1p(counts).reshape(size[1], size[0])
+    return ax.imshow(np.ma.masked_equal(image, 0), extent=(lo[0], hi[0], lo[1], hi[1]), origin='lower',
+                     cmap=cmap, interpolation='nearest', aspect='auto', zorder=zorder)
+
+
+def _edge_label_values(G, edge_labels, edges):
+    """Label of every edge, from an attribute name or a {(u, v): label} dict."""
+    if isinstance(edge_labels, str):
+        return [G.edges[e].get(edge_labels, '') for e in edges]
+    return [edge_labels.get((a, b), edge_labels.get((b, a), '')) for a, b in edges]
+
+
+def draw_graph(ax, G, pos, edges=None, node_color='lightblue', node_size=None, edgecolors=None,
+               linewidths=1.0, with_labels=None, font_size=12, edge_color='gray', width=1.0, alpha=None,
+               edge_labels=None, label_pos=0.5, label_color='red', label_size=10, label_background='white',
+               curvature=0.0, arrows=None, arrow_size=12, density_threshold=DENSITY_THRESHOLD,
+               max_labels=MAX_LABELS):
+    """
+    Draws a graph with a fixed number of artists, whatever its size.
+
+    The nodes are one PathCollection, the edges one LineCollection (or, above
+    density_threshold edges, one density image from draw_density), the
+    arrowheads one PolyCollection and the labels one EdgeLabels artist each.
+    Labels are only drawn up to max_labels nodes or edges. For undirected,
+    unlabelled graphs nx.draw already uses one LineCollection and is just as
+    fast; draw_graph wins on arrows and edge labels, which NetworkX draws as
+    one artist per edge, and on very large graphs (see benchmark_render).
+
+    Parameters:
+      ax (matplotlib Axes): Axes to draw on.
+      G (NetworkX Graph): The graph.
+      pos (dict): Node positions.
+      edges (list, optional): Edges to draw. Defaults to G.edges().
+      node_color, edgecolors, linewidths: Node style, see draw_nodes.
+      node_size (float, optional): Marker area. Defaults to 300, shrinking for large graphs.
+      with_labels (bool, optional): Draw node labels. Defaults to True up to max_labels nodes.
+      font_size (float): Node label size in points.
+      edge_color, width, alpha: Edge style, see draw_edges.
+      edge_labels (str or dict, optional): Edge attribute or {(u, v): label} to show on the edges.
+      label_pos (float): Edge label position, as in nx.draw_networkx_edge_labels
+        (0.5 is the midpoint, larger values move towards u).
+      label_color: Edge label color.
+      label_size (float): Edge label size in points.
+      label_background (optional): Fill color behind every edge label, white like
+        the bbox of nx.draw_networkx_edge_labels; None draws the bare text.
+      curvature (float): Bend of the edges, see draw_edges.
+      arrows (bool, optional): Draw arrowheads. Defaults to G.is_directed().
+      arrow_size (float): Arrowhead length in points.
+      density_threshold (int): Edge count above which the edges are rasterized.
+      max_labels (int): Largest graph that gets labels.
+
+    Returns:
+      dict: The artists, under 'nodes', 'node_labels', 'edges', 'arrows' and 'edge_labels'.
+    """
+    nodes, xy = node_positions(G, pos)
+    n = len(nodes)
+    if node_size is None:
+        node_size = 300 if n <= max_labels else max(1.0, min(20.0, 60000 / max(n, 1)))
+    if with_labels is None:
+        with_labels = n <= max_labels
+    if arrows is None:
+        arrows = G.is_directed()
+
+    edges = list(G.edges()) if edges is None else list(edges)
+    _, _, p, q = edge_segments(G, pos, edges)
+    artists = {'arrows': None, 'edge_labels': None}
+    if len(edges) > density_threshold:
+        artists['edges'] = draw_density(ax, p, q)
+    else:
+        margin = np.sqrt(node_size) / 2 if arrows else 0.0
+        artists['edges'], artists['arrows'] = draw_edges(ax, p, q, color=edge_color, width=width, alpha=alpha,
+                                                         curvature=curvature, arrows=arrows,
+                                                         arrow_size=arrow_size, margin=margin)
+    artists['nodes'], artists['node_labels'] = draw_nodes(
+        ax, xy, [str(node) for node in nodes] if with_labels else None, node_color=node_color,
+        node_size=node_size, edgecolors=edgecolors, linewidths=linewidths, font_size=font_size)
+
+    if edge_labels is not None and len(edges) <= max_labels:
+        values = _edge_label_values(G, edge_labels, edges)
+        artists['edge_labels'] = draw_edge_labels(ax, p * label_pos + q * (1 - label_pos), values,
+                                                  fontsize=label_size, color=label_color,
+                                                  background=label_background)
+        artists['edge_labels'].set_zorder(3)
+    ax.autoscale_view()
+    return artists
+
+
+def draw_mst_overlay(ax, G, T, pos, mst_color='green', mst_width=2.0, edge_color='lightgray', mst_labels=None,
+                     **kwargs):
+    """
+    Draws G and overlays the edges of its spanning tree T as a second LineCollection.
+
+    Both layers share pos, so the tree edges sit exactly on top of the
+    matching graph edges.
+
+    Parameters:
+      ax (matplotlib Axes): Axes to draw on.
+      G (NetworkX Graph): The graph.
+      T (NetworkX Graph): Its spanning tree, on the same nodes.
+      pos (dict): Node positions.
+      mst_color: Color of the tree edges.
+      mst_width (float): Line width of the tree edges.
+      edge_color: Color of the other graph edges.
+      mst_labels (str or dict, optional): Edge attribute or {(u, v): label} to show on
+        the tree edges, up to max_labels of them.
+      **kwargs: Passed on to draw_graph for G.
+
+    Returns:
+      dict: The artists of draw_graph, plus the tree edges under 'mst' and their labels
+        under 'mst_labels'.
+    """
+    artists = draw_graph(ax, G, pos, edge_color=edge_color, **kwargs)
+    edges = list(T.edges())
+    _, _, p, q = edge_segments(T, pos, edges)
+    artists['mst'], _ = draw_edges(ax, p, q, color=mst_color, width=mst_width, zorder=1.5)
+    artists['mst_labels'] = None
+    if mst_labels is not None and len(edges) <= kwargs.get('max_labels', MAX_LABELS):
+        artists['mst_labels'] = draw_edge_labels(ax, (p + q) / 2, _edge_label_values(T, mst_labels, edges),
+                                                 fontsize=kwargs.get('label_size', 10),
+                                                 color=kwargs.get('label_color', 'red'),
+                                                 background=kwargs.get('label_background', 'white'))
+        artists['mst_labels'].set_zorder(3)
+    return artists
+
+
+def benchmark_render(sizes=(1000, 5000, 100000, 1000000), average_degree=4, seed=0, compare_limit=5000):
+    """
+    Times drawing random graphs with draw_graph and nx.draw on an Agg canvas.
+
+    Three cases are compared up to compare_limit edges:
+      - plain: undirected, no labels. nx.draw also uses a single LineCollection
+        here, so both take about the same time;
+      - arrows: directed. nx.draw creates one FancyArrowPatch per edge;
+      - labels: undirected with weight labels. nx.draw_networkx_edge_labels
+        creates one Text artist per edge.
+    The last two are where the single collections pay off. Larger graphs are
+    only drawn with draw_graph, which switches to draw_density above
+    DENSITY_THRESHOLD edges, and the time per edge is printed.
+
+    Parameters:
+      sizes (tuple): Edge counts to draw.
+      average_degree (int): Edges per node, which sets the node count.
+      seed (int): Seed for the positions, edges and weights.
+      compare_limit (int): Largest graph that is also drawn with NetworkX.
+    """
+    import networkx as nx
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    rng = np.random.default_rng(seed)
+
+    def render(draw):
+        fig = Figure(figsize=(8, 8), dpi=100)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        start = time.perf_counter()
+        draw(ax)
+        fig.canvas.draw()
+        return time.perf_counter() - start
+
+    def draw_nx(G, pos, labels):
+        def draw(ax):
+            nx.draw(G, pos, ax=ax, node_size=5)
+            if labels:
+                nx.draw_networkx_edge_labels(G, pos, edge_labels=nx.get_edge_attributes(G, 'weight'), ax=ax)
+        return draw
+
+    print(f"{'edges':>8} {'case':>7} {'draw_graph (s)':>15} {'us/edge':>8} {'nx (s)':>8}")
+    for m in sizes:
+        n = max(2, m * 2 // average_degree)
+        u = rng.integers(0, n, m).tolist()
+        v = rng.integers(0, n, m).tolist()
+        pos = dict(enumerate(rng.random((n, 2))))
+        cases = [('plain', nx.Graph, False), ('arrows', nx.DiGraph, False), ('labels', nx.Graph, True)]
+        for case, graph_type, labels in cases if m <= compare_limit else cases[:1]:
+            G = graph_type()
+            G.add_nodes_from(range(n))
+            G.add_edges_from(zip(u, v))
+            nx.set_edge_attributes(G, dict(zip(G.edges(), rng.integers(1, 10, G.number_of_edges()).tolist())),
+                                   'weight')
+            edges = G.number_of_edges()
+            elapsed = render(lambda ax: draw_graph(ax, G, pos, node_size=5, with_labels=False,
+                                                   edge_labels='weight' if labels else None,
+                                                   max_labels=edges))
+            if edges > DENSITY_THRESHOLD:
+                case = 'density'
+            line = f"{edges:>8} {case:>7} {elapsed:>15.2f} {elapsed / edges * 1e6:>8.1f}"
+            if m <= compare_limit:
+                line += f" {render(draw_nx(G, pos, labels)):>8.2f}"
+            print(line)
+
+
+# Example usage:
+if __name__ == '__main__':
+    benchmark_render()
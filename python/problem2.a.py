@@ -1,6 +1,8 @@
 import networkx as nx
 import matplotlib.pyplot as plt
 
+from graph_render import draw_graph
+
 # Correct edges/weights (matching your figure)
 edges = [
     ('a', 'b', 5),  # vertical (left)
@@ -36,22 +38,19 @@ pos = {
 }
 
 plt.figure(figsize=(10, 5))
-nx.draw(
-    G, pos, with_labels=True,
-    node_color='lightblue', node_size=800,
-    font_size=12, edge_color='gray'
-)
 
 # Create the edge-label dictionary
 edge_labels = {(u, v): w for u, v, w in edges}
 
-# Draw edge labels with a small offset (label_pos) so they don’t
-# sit exactly on the middle of crossing lines:
-nx.draw_networkx_edge_labels(
-    G,
-    pos,
+# Draw nodes, edges and labels with one collection each. The edge labels
+# get a small offset (label_pos) so they don't sit exactly on the middle
+# of crossing lines:
+draw_graph(
+    plt.gca(), G, pos, with_labels=True,
+    node_color='lightblue', node_size=800,
+    font_size=12, edge_color='gray',
     edge_labels=edge_labels,
-    font_color='red',
+    label_color='red',
     label_pos=0.25  # tweak between 0.2 and 0.5 to move labels
 )
 
@@ -0,0 +1,252 @@
+import time
+
+import numpy as np
+
+from csr_graph import CSRGraph
+from scc import FINISH, _dfs_events, _rows, tarjan_labels
+
+
+def condensation(graph, num_nodes=None):
+    """
+    Collapses every strongly connected component into one vertex.
+
+    Parameters:
+      graph: A NetworkX DiGraph, a CSRGraph or edge arrays (see CSRGraph.from_graph).
+      num_nodes (int, optional): Number of nodes for edge arrays.
+
+    Returns:
+      tuple: (nodes, labels, dag) where labels[i] is the component of nodes[i] and
+        dag is the condensation as a CSRGraph without duplicate edges. Components
+        are numbered in reverse topological order, so every DAG edge a -> b has a > b.
+    """
+    csr = CSRGraph.from_graph(graph, num_nodes)
+    nodes, labels = tarjan_labels(csr)
+    count = int(labels.max(initial=-1)) + 1
+    cu = labels[csr.sources()]
+    cv = labels[csr.targets]
+    keep = cu != cv
+    # Encode each pair as one integer so np.unique drops the duplicates
+    pairs = np.unique(cu[keep] * count + cv[keep])
+    return nodes, labels, CSRGraph.from_edges(pairs // count, pairs % count, count)
+
+
+class ReachabilityIndex:
+    """
+    Answers "can u reach v?" without a fresh DFS per query.
+
+    The index is built over the condensation DAG. Small DAGs get the full
+    transitive closure as one bitset row per component, so a query is a
+    single bit test. Large DAGs get interval labels instead:
+
+      - a DFS tree interval [pre, post] per component: if v's interval lies
+        inside u's, v is a tree descendant of u and certainly reachable;
+      - num_intervals GRAIL intervals [low, post] from DFS runs with shuffled
+        children, where low is the smallest post number below a component: if
+        v's interval is not inside u's in any of them, v is certainly unreachable;
+      - the topological numbering: u can only reach components numbered below it.
+
+    Queries the labels cannot decide fall back to a DFS that is pruned by the
+    same tests, which in practice touches only a handful of components.
+    """
+
+    def __init__(self, graph, num_nodes=None, method=None, bitset_limit=16384, num_intervals=2, seed=0):
+        """
+        Parameters:
+          graph: A NetworkX DiGraph, a CSRGraph or edge arrays (see CSRGraph.from_graph).
+          num_nodes (int, optional): Number of nodes for edge arrays.
+          method (str, optional): 'bitset' or 'interval'. Defaults to 'bitset' when the
+            condensation has at most bitset_limit components.
+          bitset_limit (int): Largest condensation that gets a bitset closure by default.
+          num_intervals (int): Number of GRAIL labelings for the interval method.
+          seed (int): Seed for the shuffled DFS orders.
+        """
+        start = time.perf_counter()
+        self.nodes, self.labels, self.dag = condensation(graph, num_nodes)
+        self._index = {node: i for i, node in enumerate(self.nodes)}
+        self.num_components = self.dag.num_nodes
+        if method is None:
+            method = 'bitset' if self.num_components <= bitset_limit else 'interval'
+        self.method = method
+        if method == 'bitset':
+            self._build_bitset()
+        elif method == 'interval':
+            self._build_intervals(num_intervals, seed)
+        else:
+            raise ValueError(f"Unknown method {method!r}, expected 'bitset' or 'interval'")
+        self.build_time = time.perf_counter() - start
+
+    def _build_bitset(self):
+        # Components are numbered sinks first, so every successor row is final before it is read
+        k = self.num_components
+        offsets, targets = self.dag.offsets, self.dag.targets
+        closure = np.zeros((k, (k + 63) // 64), dtype=np.uint64)
+        one = np.uint64(1)
+        for c in range(k):
+            successors = targets[offsets[c]:offsets[c + 1]]
+            if successors.size:
+                np.bitwise_or.reduce(closure[successors], axis=0, out=closure[c])
+            closure[c, c >> 6] |= one << np.uint64(c & 63)
+        self.closure = closure
+
+    def _build_intervals(self, num_intervals, seed):
+        rng = np.random.default_rng(seed)
+        k = self.num_components
+        dag = self.dag
+
+        # Tree intervals from a plain DFS in component order
+        self.pre = np.empty(k, dtype=np.int64)
+        self.post = np.empty(k, dtype=np.int64)
+        pre = post = 0
+        for kind, c, _ in _dfs_events(*_rows(dag), range(k - 1, -1, -1), bytearray(k)):
+            if kind == FINISH:
+                self.post[c] = post
+                post += 1
+            else:
+                self.pre[c] = pre
+                pre += 1
+
+        self.lows = np.empty((num_intervals, k), dtype=np.int64)
+        self.posts = np.empty((num_intervals, k), dtype=np.int64)
+        sources = dag.sources()
+        offsets, targets = _rows(dag)
+        for j in range(num_intervals):
+            # Shuffling the edges and the roots gives a different DFS per labeling
+            order = rng.permutation(dag.num_edges)
+            shuffled = CSRGraph.from_edges(sources[order], dag.targets[order], k)
+            finished = [c for kind, c, _ in _dfs_events(*_rows(shuffled), rng.permutation(k).tolist(),
+                                                       bytearray(k))
+                        if kind == FINISH]
+            post = self.posts[j]
+            post[finished] = np.arange(k)
+            low_list = post.tolist()
+            # Successors finish first in a DAG, so one pass in finishing order suffices
+            for c in finished:
+                for i in range(offsets[c], offsets[c + 1]):
+                    t = low_list[targets[i]]
+                    if t < low_list[c]:
+                        low_list[c] = t
+            self.lows[j] = low_list
+        self._offsets, self._targets = offsets, targets
+        self._pre = self.pre.tolist()
+        self._post = self.post.tolist()
+        self._lows = self.lows.T.tolist()
+        self._posts = self.posts.T.tolist()
+
+    @property
+    def nbytes(self):
+        """Memory held by the index itself (the condensation arrays are counted too)."""
+        arrays = [self.labels, self.dag.offsets, self.dag.targets]
+        if self.method == 'bitset':
+            arrays.append(self.closure)
+        else:
+            arrays += [self.pre, self.post, self.lows, self.posts]
+        return sum(a.nbytes for a in arrays)
+
+    def _may_reach(self, a, b):
+        """False when an interval label proves component a cannot reach component b."""
+        if a < b:
+            return False
+        for la, pa, lb, pb in zip(self._lows[a], self._posts[a], self._lows[b], self._posts[b]):
+            if lb < la or pb > pa:
+                return False
+        return True
+
+    def _component_reaches(self, a, b):
+        if a == b:
+            return True
+        if self.method == 'bitset':
+            return bool(self.closure[a, b >> 6] >> np.uint64(b & 63) & np.uint64(1))
+        if not self._may_reach(a, b):
+            return False
+        pre, post = self._pre, self._post
+        offsets, targets = self._offsets, self._targets
+        seen = {a}
+        stack = [a]
+        while stack:
+            c = stack.pop()
+            if pre[c] <= pre[b] and post[b] <= post[c]:
+                return True
+            for i in range(offsets[c], offsets[c + 1]):
+                t = targets[i]
+                if t not in seen and self._may_reach(t, b):
+                    seen.add(t)
+                    stack.append(t)
+        return False
+
+    def reachable(self, u, v):
+        """True when there is a directed path from node u to node v (every node reaches itself)."""
+        return self._component_reaches(int(self.labels[self._index[u]]), int(self.labels[self._index[v]]))
+
+    def reachable_ids(self, u, v):
+        """
+        Vectorized queries by node id.
+
+        Parameters:
+          u, v (array): Node ids of the query pairs.
+
+        Returns:
+          numpy array: Boolean answer per pair.
+        """
+        a = self.labels[np.asarray(u, dtype=np.int64)]
+        b = self.labels[np.asarray(v, dtype=np.int64)]
+        if self.method == 'bitset':
+            words = self.closure[a, b >> 6]
+            return (words >> (b & 63).astype(np.uint64) & np.uint64(1)).astype(bool)
+
+        # Settle what the labels can decide in bulk and search only the rest
+        answer = (a == b) | ((self.pre[a] <= self.pre[b]) & (self.post[b] <= self.post[a]))
+        possible = ~answer & (a > b) & np.all((self.lows[:, a] <= self.lows[:, b])
+                                              & (self.posts[:, b] <= self.posts[:, a]), axis=0)
+        for i in np.flatnonzero(possible).tolist():
+            answer[i] = self._component_reaches(int(a[i]), int(b[i]))
+        return answer
+
+
+def benchmark_reachability(sizes=(1000, 10000, 100000), average_degree=1.5, queries=100000, seed=0):
+    """
+    Builds both kinds of index on random directed graphs and prints the build
+    time, the index size and the time per query, checking the answers against
+    each other (and against BFS for a sample).
+    """
+    import networkx as nx
+
+    rng = np.random.default_rng(seed)
+    print(f"{'nodes':>8} {'comps':>8} {'method':>9} {'build (s)':>10} {'size (MB)':>10} {'query (us)':>11}")
+    for n in sizes:
+        m = int(n * average_degree)
+        u = rng.integers(0, n, m)
+        v = rng.integers(0, n, m)
+        qu = rng.integers(0, n, queries)
+        qv = rng.integers(0, n, queries)
+        answers = {}
+        methods = ('bitset', 'interval') if n <= 20000 else ('interval',)
+        for method in methods:
+            index = ReachabilityIndex((u, v), n, method=method, seed=seed)
+            start = time.perf_counter()
+            answers[method] = index.reachable_ids(qu, qv)
+            per_query = (time.perf_counter() - start) / queries * 1e6
+            print(f"{n:>8} {index.num_components:>8} {method:>9} {index.build_time:>10.3f} "
+                  f"{index.nbytes / 2 ** 20:>10.2f} {per_query:>11.2f}")
+        if len(answers) == 2 and not np.array_equal(answers['bitset'], answers['interval']):
+            raise RuntimeError("Bitset and interval indexes disagree")
+
+        G = nx.DiGraph()
+        G.add_nodes_from(range(n))
+        G.add_edges_from(zip(u.tolist(), v.tolist()))
+        for a, b, expected in zip(qu[:200].tolist(), qv[:200].tolist(), answers[methods[-1]][:200].tolist()):
+            if nx.has_path(G, a, b) != expected:
+                raise RuntimeError(f"Wrong answer for {a} -> {b}")
+
+
+# Example usage:
+if __name__ == '__main__':
+    import networkx as nx
+
+    # The graph from 1_a_drawing_graph_2.py, with SCCs {a, b, c}, {d, e} and {f, g, h}
+    G = nx.DiGraph([('a', 'b'), ('b', 'a'), ('a', 'e'), ('b', 'c'), ('b', 'd'), ('c', 'e'),
+                    ('c', 'f'), ('d', 'f'), ('d', 'e'), ('e', 'f'), ('e', 'h'), ('e', 'd'),
+                    ('f', 'g'), ('g', 'h'), ('h', 'f'), ('c', 'a'), ('a', 'd')])
+    index = ReachabilityIndex(G)
+    for u, v in [('a', 'h'), ('h', 'a'), ('d', 'e'), ('f', 'c')]:
+        print(f"{u} reaches {v}: {index.reachable(u, v)}")
+    benchmark_reachability()
@@ -0,0 +1,390 @@
+import numpy as np
+
+from csr_graph import CSRGraph
+
+# Event kinds produced by _dfs_events
+START, DISCOVER, FINISH = 'start', 'discover', 'finish'
+
+
+def _rows(csr):
+    """Zero-copy memoryviews of the CSR arrays; indexing them yields plain ints for the DFS loop."""
+    return memoryview(np.ascontiguousarray(csr.offsets)), memoryview(np.ascontiguousarray(csr.targets))
+
+
+def _dfs_events(offsets, targets, roots, visited):
+    """
+    Iterative depth-first search over CSR adjacency.
+
+    Yields (kind, node, parent) with kind START for every new root, DISCOVER
+    for every tree edge and FINISH when a node has no unvisited successors
+    left (parent is -1 for roots). An explicit stack of (node, next edge)
+    replaces recursion, so deep graphs cannot hit the recursion limit.
+
+    Parameters:
+      offsets, targets (sequence): CSR adjacency, e.g. from _rows.
+      roots (iterable): Start nodes, tried in order.
+      visited (bytearray): Visited flags, updated in place.
+    """
+    for root in roots:
+        if visited[root]:
+            continue
+        visited[root] = 1
+        yield START, root, -1
+        stack = [root]
+        cursor = [offsets[root]]
+        while stack:
+            node = stack[-1]
+            i = cursor[-1]
+            end = offsets[node + 1]
+            while i < end and visited[targets[i]]:
+                i += 1
+            if i < end:
+                cursor[-1] = i + 1
+                child = targets[i]
+                visited[child] = 1
+                yield DISCOVER, child, node
+                stack.append(child)
+                cursor.append(offsets[child])
+            else:
+                stack.pop()
+                cursor.pop()
+                yield FINISH, node, stack[-1] if stack else -1
+
+
+def _finish_order(num_nodes, offsets, targets):
+    visited = bytearray(num_nodes)
+    return [node for kind, node, _ in _dfs_events(offsets, targets, range(num_nodes), visited)
+            if kind == FINISH]
+
+
+def kosaraju_labels(graph, num_nodes=None):
+    """
+    Finds the strongly connected components with Kosaraju's algorithm, without tracing.
+
+    Both passes walk contiguous CSR arrays; the reversed graph is the cached
+    CSRGraph.transpose() instead of a copied NetworkX graph.
+
+    Parameters:
+      graph: A NetworkX DiGraph, a CSRGraph or edge arrays (see CSRGraph.from_graph).
+      num_nodes (int, optional): Number of nodes for edge arrays.
+
+    Returns:
+      tuple: (nodes, labels) where labels[i] is the component of nodes[i].
+        Components are numbered in the order the second pass finds them.
+    """
+    csr = CSRGraph.from_graph(graph, num_nodes)
+    n = csr.num_nodes
+    order = _finish_order(n, *_rows(csr))
+
+    labels = np.full(n, -1, dtype=np.int64)
+    visited = bytearray(n)
+    component = -1
+    for kind, node, _ in _dfs_events(*_rows(csr.transpose()), reversed(order), visited):
+        if kind == START:
+            component += 1
+            labels[node] = component
+        elif kind == DISCOVER:
+            labels[node] = component
+    return csr.nodes, labels
+
+
+def kosaraju_scc(graph, num_nodes=None):
+    """
+    Returns the strongly connected components as lists of nodes.
+
+    Parameters:
+      graph: A NetworkX DiGraph, a CSRGraph or edge arrays (see CSRGraph.from_graph).
+      num_nodes (int, optional): Number of nodes for edge arrays.
+
+    Returns:
+      list: One list of nodes per component, in the order Kosaraju finds them.
+    """
+    nodes, labels = kosaraju_labels(graph, num_nodes)
+    components = [[] for _ in range(int(labels.max(initial=-1)) + 1)]
+    for node, label in zip(nodes, labels.tolist()):
+        components[label].append(node)
+    return components
+
+
+def _kosaraju_trace(csr, passes):
+    """
+    Runs both passes of Kosaraju's algorithm and yields one record per DFS event.
+
+    Records are (pass, kind, node, parent, desc, scc) with node ids, the
+    numbered description of the step and, in the second pass, the component
+    number (None in the first pass). Only the passes listed in passes are
+    yielded; the first pass always runs for the finishing order.
+    """
+    nodes = csr.nodes
+    n = csr.num_nodes
+
+    # First pass: record the finishing order while describing the steps
+    order = []
+    finished = 0
+    events = _dfs_events(*_rows(csr), range(n), bytearray(n))
+    for number, (kind, node, parent) in enumerate(events, start=1):
+        label = nodes[node]
+        if kind == FINISH:
+            order.append(node)
+            finished += 1
+            if parent >= 0:
+                desc = f"{label} finished. Backtrack to {nodes[parent]}."
+            elif finished == n:
+                desc = f"{label} finished. DFS complete."
+            else:
+                desc = f"{label} finished. DFS from {label} complete."
+        elif kind == START:
+            desc = f"Start {'new ' if finished else ''}DFS at node {label}."
+        else:
+            desc = f"From {nodes[parent]}, explore to {label}."
+        if 1 in passes:
+            yield 1, kind, node, parent, f"Step {number}: {desc}", None
+
+    if 2 not in passes:
+        return
+
+    # Second pass on the reversed graph in decreasing finishing time
+    finished = 0
+    component = []
+    scc = 0
+    events = _dfs_events(*_rows(csr.transpose()), reversed(order), bytearray(n))
+    for number, (kind, node, parent) in enumerate(events, start=1):
+        label = nodes[node]
+        if kind == FINISH:
+            finished += 1
+            if parent >= 0:
+                desc = f"Finished exploring {label}; backtrack to {nodes[parent]}."
+            else:
+                members = ", ".join(str(member) for member in component)
+                desc = f"Finished DFS from {label}. SCC{scc} = {{{members}}}."
+        else:
+            if kind == START:
+                scc += 1
+                component = []
+                desc = f"Start {'new ' if finished else ''}DFS at node {label}."
+            else:
+                desc = f"From {nodes[parent]}, explore neighbor {label}."
+            component.append(label)
+        yield 2, kind, node, parent, f"Step {number} (SCC{scc}): {desc}", scc
+
+
+def _trace_steps(nodes, trace):
+    """Expands trace records into the step dicts, restarting the sets at every new pass."""
+    current_pass = None
+    for pass_number, kind, node, _, desc, scc in trace:
+        if pass_number != current_pass:
+            current_pass = pass_number
+            visited, stack, finished = set(), [], set()
+        label = nodes[node]
+        if kind == FINISH:
+            stack.pop()
+            finished.add(label)
+            current = None
+        else:
+            visited.add(label)
+            stack.append(label)
+            current = label
+        step = {"visited": set(visited), "stack": list(stack), "finished": set(finished),
+                "current": current, "desc": desc, "pass": pass_number}
+        if scc is not None:
+            step["scc"] = scc
+        yield step
+
+
+def kosaraju_steps(graph, passes=(1, 2), num_nodes=None):
+    """
+    Runs Kosaraju's algorithm and yields one animation step per DFS event.
+
+    Every step is a dict with the keys used by the animation scripts:
+      visited: nodes that have been discovered in the current pass
+      stack: nodes currently on the DFS stack
+      finished: nodes that have been completely processed in the current pass
+      current: the node being explored at this step (None when backtracking)
+      desc: description of the current step
+    plus "pass" (1 or 2) and, in the second pass, "scc" (component number).
+
+    The first pass runs on the graph in node order; the second runs on the
+    reversed graph in decreasing finishing time, one component per DFS tree.
+    Every step copies the sets, so for large graphs dfs_animation.DiffTrace
+    stores the same steps as diffs instead.
+
+    Parameters:
+      graph: A NetworkX DiGraph, a CSRGraph or edge arrays (see CSRGraph.from_graph).
+      passes (tuple): Which passes to yield steps for. The first pass always runs, since
+        it gives the finishing order; the second runs only when it is requested.
+      num_nodes (int, optional): Number of nodes for edge arrays.
+    """
+    csr = CSRGraph.from_graph(graph, num_nodes)
+    return _trace_steps(csr.nodes, _kosaraju_trace(csr, passes))
+
+
+def _tarjan_events(offsets, targets, num_nodes):
+    """
+    Iterative Tarjan: one DFS that also maintains index/lowlink and the component stack.
+
+    Yields (kind, node, parent, component) like _dfs_events, where component
+    is the list of the node's SCC (in discovery order) when a FINISH closes
+    one and None otherwise.
+    """
+    index = [-1] * num_nodes
+    low = [0] * num_nodes
+    on_stack = bytearray(num_nodes)
+    stack_position = [0] * num_nodes  # where each node sits on component_stack
+    component_stack = []
+    counter = 0
+    for root in range(num_nodes):
+        if index[root] >= 0:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack_position[root] = len(component_stack)
+        component_stack.append(root)
+        on_stack[root] = 1
+        yield START, root, -1, None
+        stack = [root]
+        cursor = [offsets[root]]
+        while stack:
+            node = stack[-1]
+            i = cursor[-1]
+            end = offsets[node + 1]
+            child = -1
+            while i < end:
+                w = targets[i]
+                i += 1
+                if index[w] < 0:
+                    child = w
+                    break
+                if on_stack[w] and index[w] < low[node]:
+                    low[node] = index[w]
+            if child >= 0:
+                cursor[-1] = i
+                index[child] = low[child] = counter
+                counter += 1
+                stack_position[child] = len(component_stack)
+                component_stack.append(child)
+                on_stack[child] = 1
+                yield DISCOVER, child, node, None
+                stack.append(child)
+                cursor.append(offsets[child])
+                continue
+
+            stack.pop()
+            cursor.pop()
+            parent = stack[-1] if stack else -1
+            if parent >= 0 and low[node] < low[parent]:
+                low[parent] = low[node]
+            component = None
+            if low[node] == index[node]:
+                # node is the root of an SCC: everything above it on the stack belongs to it
+                component = component_stack[stack_position[node]:]
+                del component_stack[stack_position[node]:]
+                for w in component:
+                    on_stack[w] = 0
+            yield FINISH, node, parent, component
+
+
+def tarjan_labels(graph, num_nodes=None):
+    """
+    Finds the strongly connected components with Tarjan's single-pass algorithm, without tracing.
+
+    Unlike Kosaraju it needs neither a second traversal nor the reversed graph.
+
+    Parameters:
+      graph: A NetworkX DiGraph, a CSRGraph or edge arrays (see CSRGraph.from_graph).
+      num_nodes (int, optional): Number of nodes for edge arrays.
+
+    Returns:
+      tuple: (nodes, labels) where labels[i] is the component of nodes[i].
+        Components are numbered in reverse topological order of the condensation.
+    """
+    csr = CSRGraph.from_graph(graph, num_nodes)
+    labels = np.full(csr.num_nodes, -1, dtype=np.int64)
+    component_id = 0
+    for kind, _, _, component in _tarjan_events(*_rows(csr), csr.num_nodes):
+        if component is not None:
+            labels[component] = component_id
+            component_id += 1
+    return csr.nodes, labels
+
+
+def _tarjan_trace(csr):
+    """Yields Tarjan's DFS events as (pass, kind, node, parent, desc, scc) records like _kosaraju_trace."""
+    nodes = csr.nodes
+    finished = 0
+    scc = 0
+    events = _tarjan_events(*_rows(csr), csr.num_nodes)
+    for number, (kind, node, parent, component) in enumerate(events, start=1):
+        label = nodes[node]
+        if kind == FINISH:
+            finished += 1
+            if component is not None:
+                scc += 1
+                members = ", ".join(str(nodes[member]) for member in component)
+                desc = f"{label} finished and is the root of SCC{scc} = {{{members}}}."
+            else:
+                desc = f"{label} finished. Backtrack to {nodes[parent]}."
+        elif kind == START:
+            desc = f"Start {'new ' if finished else ''}DFS at node {label}."
+        else:
+            desc = f"From {nodes[parent]}, explore to {label}."
+        yield 1, kind, node, parent, f"Step {number}: {desc}", scc
+
+
+def tarjan_steps(graph, num_nodes=None):
+    """
+    Runs Tarjan's algorithm and yields animation steps in the kosaraju_steps format.
+
+    The "stack" key holds the DFS stack, as in the Kosaraju animations; every
+    step also carries "scc", the number of components closed so far, and the
+    finish step that closes a component names its members.
+
+    Parameters:
+      graph: A NetworkX DiGraph, a CSRGraph or edge arrays (see CSRGraph.from_graph).
+      num_nodes (int, optional): Number of nodes for edge arrays.
+    """
+    csr = CSRGraph.from_graph(graph, num_nodes)
+    return _trace_steps(csr.nodes, _tarjan_trace(csr))
+
+
+def _same_partition(a, b):
+    """True when two label arrays group the nodes identically (up to renumbering)."""
+    pairs = np.unique(np.stack([a, b]), axis=1)
+    return pairs.shape[1] == len(np.unique(a)) == len(np.unique(b))
+
+
+def benchmark_scc(sizes=(10000, 100000, 300000), average_degree=3, seed=0):
+    """
+    Compares Kosaraju and Tarjan on random directed graphs of increasing size.
+
+    Prints the wall time of an untraced run and the peak memory of a second
+    run under tracemalloc (NumPy buffers included) for each algorithm. Both
+    start from a freshly built CSRGraph, so Kosaraju pays for its transpose.
+    """
+    import time
+    import tracemalloc
+
+    rng = np.random.default_rng(seed)
+    print(f"{'nodes':>10} {'edges':>10} {'algorithm':>10} {'time (s)':>10} {'peak (MB)':>10}")
+    for n in sizes:
+        m = n * average_degree
+        u = rng.integers(0, n, m)
+        v = rng.integers(0, n, m)
+        results = {}
+        for name, find in (('kosaraju', kosaraju_labels), ('tarjan', tarjan_labels)):
+            start = time.perf_counter()
+            _, labels = find(CSRGraph.from_edges(u, v, n))
+            elapsed = time.perf_counter() - start
+            results[name] = labels
+
+            csr = CSRGraph.from_edges(u, v, n)
+            tracemalloc.start()
+            find(csr)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{n:>10} {m:>10} {name:>10} {elapsed:>10.2f} {peak / 2 ** 20:>10.1f}")
+        if not _same_partition(results['kosaraju'], results['tarjan']):
+            raise RuntimeError("Kosaraju and Tarjan disagree")
+
+
+if __name__ == '__main__':
+    benchmark_scc()
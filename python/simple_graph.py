@@ -1,6 +1,8 @@
 import networkx as nx
 import matplotlib.pyplot as plt
 
+from graph_render import draw_graph
+
 # Create a directed graph
 G = nx.DiGraph()
 
@@ -42,31 +44,20 @@ pos = {
 # Create the figure
 plt.figure(figsize=(8, 4))
 
-# Draw nodes: white circles with black borders
-nx.draw_networkx_nodes(
-    G, pos,
+# Draw nodes (white circles with black borders), labels and edges with
+# arrows; every group is a single collection
+draw_graph(
+    plt.gca(), G, pos,
     node_size=1200,
     node_color='white',
     edgecolors='black',
-    linewidths=1.5
-)
-
-# Draw labels
-nx.draw_networkx_labels(G, pos, font_size=12, font_color='black')
-
-# Draw edges with arrows
-nx.draw_networkx_edges(
-    G,
-    pos,
-    arrows=True,
-    arrowstyle='-|>',
-    arrowsize=20,
+    linewidths=1.5,
+    font_size=12,
     edge_color='black',
+    arrows=True,
+    arrow_size=12,
     # Slight curvature to differentiate edges
-    connectionstyle='arc3,rad=0.15',
-    # Margins help keep arrows from getting hidden behind the nodes
-    min_source_margin=15,
-    min_target_margin=15
+    curvature=0.15
 )
 
 plt.axis('off')